@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import os
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
 
 
 @dataclass(frozen=True)
@@ -19,7 +19,7 @@ class BackupError(RuntimeError):
 
 class BackupManager:
     """
-    Sauvegarde cohérente SQLite via API .backup() (robuste, compatible).
+    Sauvegarde cohérente SQLite via VACUUM INTO (snapshot compacté, sans pages libres).
     Écrit un fichier dans un dossier OneDrive (local), OneDrive se charge de sync.
     """
 
@@ -33,11 +33,15 @@ class BackupManager:
 
     def create_backup(
         self,
-        source_conn: sqlite3.Connection,
+        source: sqlite3.Connection,
         target_dir: Path,
         *,
         invoice_prefix: str = "FAC",
     ) -> BackupResult:
+        """
+        source : connexion à copier (lecture seule du ReadPool, ou connexion
+        d'écriture quand aucun pool n'est disponible).
+        """
         if not target_dir:
             raise BackupError("Dossier OneDrive non configuré.")
 
@@ -57,28 +61,20 @@ class BackupManager:
         if backup_path.exists():
             raise BackupError("Un fichier de sauvegarde du même nom existe déjà.")
 
-        # Snapshot cohérent
-        dest_conn: Optional[sqlite3.Connection] = None
+        # Snapshot cohérent et compacté, écrit par SQLite dans un fichier temporaire
+        # puis renommé (os.replace, atomique) : OneDrive ne voit jamais de fichier partiel
+        tmp_path = backup_path.with_name(backup_name + ".part")
         try:
-            dest_conn = sqlite3.connect(str(backup_path))
-            # Copie atomique du contenu via l'API sqlite3
-            source_conn.backup(dest_conn)
-            dest_conn.commit()
+            source.execute("VACUUM INTO ?", (str(tmp_path),))
+            os.replace(tmp_path, backup_path)
         except Exception as e:
             # Nettoyage si création partielle
-            try:
-                if dest_conn:
-                    dest_conn.close()
-            finally:
-                if backup_path.exists():
-                    try:
-                        backup_path.unlink()
-                    except Exception:
-                        pass
+            if tmp_path.exists():
+                try:
+                    tmp_path.unlink()
+                except Exception:
+                    pass
             raise BackupError(f"Échec de sauvegarde SQLite : {e}") from e
-        finally:
-            if dest_conn:
-                dest_conn.close()
 
         # Rotation
         self._rotate_backups(target_dir)
@@ -86,15 +82,22 @@ class BackupManager:
         return BackupResult(backup_path=backup_path, created_at_iso=created_at_iso)
 
     def _rotate_backups(self, target_dir: Path) -> None:
-        # On conserve les N fichiers les plus récents correspondant au préfixe
-        backups = sorted(
-            target_dir.glob(f"{self.prefix}_*.db"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
-        )
-        for old in backups[self.keep_last :]:
+        # On conserve les N fichiers les plus récents correspondant au préfixe.
+        # scandir : les métadonnées viennent avec l'entrée (pas de stat() en plus sous Windows)
+        head = f"{self.prefix}_"
+        with os.scandir(target_dir) as it:
+            backups = [
+                (e.stat().st_mtime, e.path)
+                for e in it
+                if e.name.startswith(head) and e.name.endswith(".db") and e.is_file()
+            ]
+        if len(backups) <= self.keep_last:
+            return
+
+        backups.sort(reverse=True)
+        for _mtime, old in backups[self.keep_last :]:
             try:
-                old.unlink()
+                os.unlink(old)
             except Exception:
                 # En cas de verrouillage OneDrive/AV, on n’échoue pas la sauvegarde
                 pass
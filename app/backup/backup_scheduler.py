@@ -4,16 +4,48 @@ import sqlite3
 from pathlib import Path
 from typing import Callable, Optional
 
-from PySide6.QtCore import QObject, QTimer
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
 
-from app.backup.backup_manager import BackupManager, BackupError
+from app.backup.backup_manager import BackupManager, BackupError, BackupResult
+from app.db.pool import ReadPool
 from app.db.repos.settings_repo import SettingsRepository
 
 
+class _BackupSignals(QObject):
+    # Émis depuis le thread du pool, reçus dans le thread UI (connexion en file)
+    done = Signal(object)  # BackupResult
+    failed = Signal(str)
+
+
+class _BackupJob(QRunnable):
+    """
+    Snapshot exécuté hors du thread UI, sur une connexion lecture seule du pool :
+    la connexion d'écriture de l'UI n'est jamais partagée avec ce thread.
+    """
+
+    def __init__(self, backup_manager: BackupManager, read_pool: ReadPool, target_dir: Path) -> None:
+        super().__init__()
+        self.backup_manager = backup_manager
+        self.read_pool = read_pool
+        self.target_dir = target_dir
+        self.signals = _BackupSignals()
+
+    def run(self) -> None:
+        try:
+            with self.read_pool.reader() as ro_conn:
+                result = self.backup_manager.create_backup(ro_conn, self.target_dir)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.done.emit(result)
+
+
 class BackupScheduler(QObject):
     """
     Gère la sauvegarde automatique :
-    - périodique (toutes les X minutes) si db_dirty
+    - après modification : mark_dirty() (re)lance un délai de calme ; les écritures
+      rapprochées sont regroupées en une seule sauvegarde
+    - périodique (toutes les X minutes) si db_dirty, en filet de sécurité
     - à la fermeture (si db_dirty)
     - extensible plus tard : après validation facture (mark_dirty + try_backup)
     """
@@ -22,31 +54,56 @@ class BackupScheduler(QObject):
         self,
         *,
         conn: sqlite3.Connection,
+        read_pool: Optional[ReadPool] = None,
         settings_repo: SettingsRepository,
         backup_manager: BackupManager,
         interval_minutes: int = 30,
+        quiet_seconds: int = 120,
         on_status: Optional[Callable[[str], None]] = None,
     ) -> None:
         super().__init__()
         self.conn = conn
+        # Sans pool (ex. DB en mémoire), la sauvegarde reste synchrone sur conn
+        self.read_pool = read_pool
         self.settings_repo = settings_repo
         self.backup_manager = backup_manager
         self.on_status = on_status
 
         self.db_dirty = False
+        # Dossier cible lu en base une seule fois, invalidé à la sauvegarde des paramètres
+        self._cached_target_dir: Optional[str] = None
+        self._job: Optional[_BackupJob] = None
 
         self.timer = QTimer(self)
         self.timer.setInterval(interval_minutes * 60 * 1000)
         self.timer.timeout.connect(self._on_timer)
 
+        # Déclenché par mark_dirty() ; redémarré à chaque écriture (debounce)
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(quiet_seconds * 1000)
+        self._debounce.timeout.connect(self._on_timer)
+
     def start(self) -> None:
         self.timer.start()
 
     def stop(self) -> None:
         self.timer.stop()
+        self._debounce.stop()
 
     def mark_dirty(self) -> None:
         self.db_dirty = True
+        if self.timer.isActive():
+            self._debounce.start()
+
+    def invalidate_settings_cache(self) -> None:
+        self._cached_target_dir = None
+
+    def _target_dir(self) -> str:
+        if self._cached_target_dir is None:
+            settings = self.settings_repo.get()
+            self._cached_target_dir = (settings.get("onedrive_backup_dir") or "").strip()
+        return self._cached_target_dir
 
     def try_backup_now(self, *, force: bool = False) -> bool:
         """
@@ -56,26 +113,62 @@ class BackupScheduler(QObject):
             self._emit("Sauvegarde auto : aucune modification, rien à faire.")
             return False
 
-        settings = self.settings_repo.get()
-        target_dir = (settings.get("onedrive_backup_dir") or "").strip()
+        target_dir = self._target_dir()
         if not target_dir:
             self._emit("Sauvegarde : dossier OneDrive non configuré.")
             return False
 
         try:
-            result = self.backup_manager.create_backup(self.conn, Path(target_dir))
-            self.settings_repo.update_last_backup(result.created_at_iso)
+            if self.read_pool is not None:
+                with self.read_pool.reader() as ro_conn:
+                    result = self.backup_manager.create_backup(ro_conn, Path(target_dir))
+            else:
+                result = self.backup_manager.create_backup(self.conn, Path(target_dir))
+            # Un seul commit sur la base principale après le snapshot
+            with self.conn:
+                self.settings_repo.update_last_backup(result.created_at_iso, commit=False)
             self.db_dirty = False
             self._emit(f"Sauvegarde OK : {result.backup_path.name}")
             return True
         except BackupError as e:
             self._emit(f"Sauvegarde impossible : {e}")
             return False
-        self.settings_repo.update_last_backup(result.created_at_iso)
-
 
     def _on_timer(self) -> None:
-        self.try_backup_now(force=False)
+        if self.read_pool is None:
+            self.try_backup_now(force=False)
+            return
+
+        # Une seule sauvegarde en cours à la fois
+        if self._job is not None:
+            return
+        if not self.db_dirty:
+            self._emit("Sauvegarde auto : aucune modification, rien à faire.")
+            return
+
+        target_dir = self._target_dir()
+        if not target_dir:
+            self._emit("Sauvegarde : dossier OneDrive non configuré.")
+            return
+
+        # Remis à True en cas d'échec ; une écriture pendant la copie le repasse à True
+        self.db_dirty = False
+        job = _BackupJob(self.backup_manager, self.read_pool, Path(target_dir))
+        job.signals.done.connect(self._on_job_done)
+        job.signals.failed.connect(self._on_job_failed)
+        self._job = job
+        QThreadPool.globalInstance().start(job)
+
+    def _on_job_done(self, result: BackupResult) -> None:
+        self._job = None
+        with self.conn:
+            self.settings_repo.update_last_backup(result.created_at_iso, commit=False)
+        self._emit(f"Sauvegarde OK : {result.backup_path.name}")
+
+    def _on_job_failed(self, msg: str) -> None:
+        self._job = None
+        self.db_dirty = True
+        self._emit(f"Sauvegarde impossible : {msg}")
 
     def _emit(self, msg: str) -> None:
         if self.on_status:
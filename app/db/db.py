@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import sqlite3
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
 def _resource_path(rel: str) -> Path:
     """
     Résout un fichier "ressource" :
@@ -20,28 +22,52 @@ def _resource_path(rel: str) -> Path:
     return project_root / rel
 
 
+# Horodatage local calculé par SQLite (même format que isoformat(timespec="seconds")),
+# pour les colonnes created_at / updated_at des repositories.
+# 'now' est figé pour toute la durée d'une instruction.
+SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')"
+
+
 def connect(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), cached_statements=256)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
-    conn.execute("PRAGMA journal_mode = WAL;")
-    conn.execute("PRAGMA synchronous = NORMAL;")
-    conn.execute("PRAGMA busy_timeout = 3000;")
+    journal_mode = conn.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+    # NORMAL n'est sûr qu'en WAL ; si WAL est refusé (ex. partage réseau), on garde FULL
+    if str(journal_mode).lower() == "wal":
+        conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    # Cache de pages 64 Mo (valeur négative = Kio), tris temporaires en RAM,
+    # lecture mmap jusqu'à 256 Mo pour les listes
+    conn.execute("PRAGMA cache_size = -65536;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA mmap_size = 268435456;")
+    conn.execute("PRAGMA wal_autocheckpoint = 1000;")
     return conn
 
 
+@lru_cache(maxsize=None)
+def _schema_sql() -> str:
+    # Lu une seule fois par processus
+    return _resource_path("app/db/schema.sql").read_bytes().decode("utf-8")
+
+
 def init_schema(conn: sqlite3.Connection) -> None:
-    schema_path = _resource_path("app/db/schema.sql")
-    schema = schema_path.read_text(encoding="utf-8")
-    conn.executescript(schema)
+    conn.executescript(_schema_sql())
     _migrate(conn)
     conn.commit()
 
 
+# Tables interrogées via PRAGMA table_info (nom injecté dans le SQL)
+_KNOWN_TABLES = frozenset({"settings", "counter", "invoice", "invoice_line", "pdf_export"})
+
+
 def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
-    cur = conn.execute(f"PRAGMA table_info({table})")
-    return any(r["name"] == column for r in cur.fetchall())
+    if table not in _KNOWN_TABLES:
+        raise ValueError(f"Table inconnue : {table}")
+    # Itération directe sur le curseur : any() s'arrête à la première correspondance
+    return any(r["name"] == column for r in conn.execute(f"PRAGMA table_info({table})"))
 
 
 def _invoice_table_allows_paid(conn: sqlite3.Connection) -> bool:
@@ -125,48 +151,128 @@ def _migrate_invoice_add_paid(conn: sqlite3.Connection) -> None:
         conn.execute("PRAGMA foreign_keys = ON;")
 
 
-def _migrate(conn: sqlite3.Connection) -> None:
-    # Colonnes manquantes (DB ancienne)
-    if not _has_column(conn, "settings", "garage_postal_code"):
-        conn.execute("ALTER TABLE settings ADD COLUMN garage_postal_code TEXT NOT NULL DEFAULT ''")
-        
-    if not _has_column(conn, "settings", "garage_siret"):
-        conn.execute("ALTER TABLE settings ADD COLUMN garage_siret TEXT NOT NULL DEFAULT ''")
-        
-    if not _has_column(conn, "settings", "garage_email"):
-        conn.execute("ALTER TABLE settings ADD COLUMN garage_email TEXT NOT NULL DEFAULT ''")
-        
-    if not _has_column(conn, "invoice", "customer_postal_code"):
-        conn.execute("ALTER TABLE invoice ADD COLUMN customer_postal_code TEXT NOT NULL DEFAULT ''")
-        
-    if not _has_column(conn, "invoice", "customer_email"):
-        conn.execute("ALTER TABLE invoice ADD COLUMN customer_email TEXT NOT NULL DEFAULT ''")
-
-    if not _has_column(conn, "invoice", "customer_phone"):
-        conn.execute("ALTER TABLE invoice ADD COLUMN customer_phone TEXT NOT NULL DEFAULT ''")
-        
-    if not _has_column(conn, "invoice_line", "reference"):
-        conn.execute("ALTER TABLE invoice_line ADD COLUMN reference TEXT NOT NULL DEFAULT ''")
-
-    # Table PDF exports + index unique (sécurité si DB existante)
+def _ensure_invoice_fts(conn: sqlite3.Connection) -> None:
+    """
+    Index plein texte (FTS5 trigram, contenu externe) sur number / customer_name / date,
+    synchronisé par triggers. Le tokenizer trigram sert les recherches par
+    sous-chaîne (équivalent de LIKE '%...%'). Ignoré si SQLite n'a pas FTS5
+    trigram (< 3.34) : la recherche retombe alors sur LIKE.
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='invoice_fts'"
+    ).fetchone()
+    if row and "trigram" not in (row["sql"] or "").lower():
+        # Ancien index (tokenizer par mots) : on le reconstruit
+        for trigger in ("invoice_fts_ai", "invoice_fts_ad", "invoice_fts_au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+        conn.execute("DROP TABLE invoice_fts;")
+        row = None
+
+    if not row:
+        try:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE invoice_fts USING fts5(
+                  number, customer_name, date,
+                  content='invoice', content_rowid='id',
+                  tokenize='trigram'
+                );
+                """
+            )
+        except sqlite3.OperationalError:
+            return
+        # Indexe les factures déjà présentes
+        conn.execute("INSERT INTO invoice_fts(invoice_fts) VALUES ('rebuild');")
+
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS invoice_fts_ai AFTER INSERT ON invoice BEGIN
+          INSERT INTO invoice_fts(rowid, number, customer_name, date)
+          VALUES (new.id, new.number, new.customer_name, new.date);
+        END;
+        """
+    )
     conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS pdf_export (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          invoice_id INTEGER NOT NULL,
-          filename TEXT NOT NULL,
-          rel_path TEXT NOT NULL,
-          created_at TEXT NOT NULL,
-          kind TEXT NOT NULL DEFAULT 'INVOICE',
-          FOREIGN KEY (invoice_id) REFERENCES invoice(id) ON DELETE CASCADE
-        );
+        CREATE TRIGGER IF NOT EXISTS invoice_fts_ad AFTER DELETE ON invoice BEGIN
+          INSERT INTO invoice_fts(invoice_fts, rowid, number, customer_name, date)
+          VALUES ('delete', old.id, old.number, old.customer_name, old.date);
+        END;
         """
     )
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_export_invoice_id ON pdf_export(invoice_id);")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_export_created_at ON pdf_export(created_at);")
     conn.execute(
         """
-        CREATE UNIQUE INDEX IF NOT EXISTS uq_pdf_export_invoice_filename
-        ON pdf_export(invoice_id, filename);
+        CREATE TRIGGER IF NOT EXISTS invoice_fts_au AFTER UPDATE ON invoice BEGIN
+          INSERT INTO invoice_fts(invoice_fts, rowid, number, customer_name, date)
+          VALUES ('delete', old.id, old.number, old.customer_name, old.date);
+          INSERT INTO invoice_fts(rowid, number, customer_name, date)
+          VALUES (new.id, new.number, new.customer_name, new.date);
+        END;
         """
     )
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    # Un seul commit pour toutes les migrations. BEGIN explicite : sans lui,
+    # sqlite3 laisse chaque ALTER/CREATE s'auto-commiter.
+    with conn:
+        conn.execute("BEGIN;")
+
+        # Colonnes manquantes (DB ancienne)
+        if not _has_column(conn, "settings", "garage_postal_code"):
+            conn.execute("ALTER TABLE settings ADD COLUMN garage_postal_code TEXT NOT NULL DEFAULT ''")
+
+        if not _has_column(conn, "settings", "garage_siret"):
+            conn.execute("ALTER TABLE settings ADD COLUMN garage_siret TEXT NOT NULL DEFAULT ''")
+
+        if not _has_column(conn, "settings", "garage_email"):
+            conn.execute("ALTER TABLE settings ADD COLUMN garage_email TEXT NOT NULL DEFAULT ''")
+
+        if not _has_column(conn, "invoice", "customer_postal_code"):
+            conn.execute("ALTER TABLE invoice ADD COLUMN customer_postal_code TEXT NOT NULL DEFAULT ''")
+
+        if not _has_column(conn, "invoice", "customer_email"):
+            conn.execute("ALTER TABLE invoice ADD COLUMN customer_email TEXT NOT NULL DEFAULT ''")
+
+        if not _has_column(conn, "invoice", "customer_phone"):
+            conn.execute("ALTER TABLE invoice ADD COLUMN customer_phone TEXT NOT NULL DEFAULT ''")
+
+        if not _has_column(conn, "invoice_line", "reference"):
+            conn.execute("ALTER TABLE invoice_line ADD COLUMN reference TEXT NOT NULL DEFAULT ''")
+
+        # Index redondant avec uq_invoice_line_position (même préfixe invoice_id)
+        conn.execute("DROP INDEX IF EXISTS idx_invoice_line_invoice_id;")
+
+        # Table PDF exports + index unique (sécurité si DB existante)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pdf_export (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              invoice_id INTEGER NOT NULL,
+              filename TEXT NOT NULL,
+              rel_path TEXT NOT NULL,
+              created_at TEXT NOT NULL,
+              kind TEXT NOT NULL DEFAULT 'INVOICE',
+              FOREIGN KEY (invoice_id) REFERENCES invoice(id) ON DELETE CASCADE
+            );
+            """
+        )
+        # Remplacés par des index composites (voir schema.sql)
+        conn.execute("DROP INDEX IF EXISTS idx_pdf_export_invoice_id;")
+        conn.execute("DROP INDEX IF EXISTS idx_pdf_export_created_at;")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pdf_export_invoice_kind ON pdf_export(invoice_id, kind);"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pdf_export_created_at_id "
+            "ON pdf_export(created_at DESC, id DESC);"
+        )
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_pdf_export_invoice_filename
+            ON pdf_export(invoice_id, filename);
+            """
+        )
+
+        # Recherche plein texte sur les factures
+        _ensure_invoice_fts(conn)
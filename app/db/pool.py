@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List
+
+from app.db.db import connect
+
+
+class ReadPool:
+    """
+    Connexions lecture seule (mode=ro) réutilisables, à côté de la connexion
+    d'écriture. En WAL, un lecteur ne bloque pas l'écrivain (et inversement) :
+    une lecture longue (snapshot de sauvegarde) ne fige donc pas l'UI.
+
+    Les connexions sont ouvertes à la demande et sans check_same_thread :
+    la file garantit qu'une connexion n'est utilisée que par un thread à la fois.
+    """
+
+    def __init__(self, db_path: Path, size: int = 2) -> None:
+        self.db_path = Path(db_path)
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        # Attend un emplacement libre (au plus `size` lecteurs simultanés)
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+                self._all.append(conn)
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        for conn in self._all:
+            conn.close()
+        self._all.clear()
+
+
+class ConnectionPool:
+    """
+    Une connexion d'écriture (thread UI, partagée par les repositories)
+    + un ReadPool pour les lectures faites hors du thread UI.
+    """
+
+    def __init__(self, db_path: Path, *, readers: int = 2) -> None:
+        self.writer = connect(db_path)
+        self.read_pool = ReadPool(db_path, size=readers)
+
+    def close(self) -> None:
+        self.read_pool.close()
+        self.writer.close()
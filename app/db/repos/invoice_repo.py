@@ -2,12 +2,12 @@ from __future__ import annotations
 
 import sqlite3
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
+from app.db.db import SQL_NOW
 
-@dataclass(frozen=True)
-class InvoiceListItem:
+
+class InvoiceListItem(NamedTuple):
     id: int
     number: Optional[str]
     date: str
@@ -15,7 +15,7 @@ class InvoiceListItem:
     total_cents: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InvoiceHeader:
     id: int
     number: Optional[str]
@@ -31,8 +31,7 @@ class InvoiceHeader:
     total_cents: int
 
 
-@dataclass(frozen=True)
-class InvoiceLine:
+class InvoiceLine(NamedTuple):
     id: int
     invoice_id: int
     position: int
@@ -43,47 +42,193 @@ class InvoiceLine:
     line_total_cents: int
 
 
+# Requêtes fréquentes : texte SQL constant => réutilisation du cache
+# de statements préparés de la connexion.
+# Listes paginées par clé (id < dernier id vu, pas d'OFFSET : une écriture entre
+# deux pages ne décale rien) ; LIMIT -1 (sans limite) pour la liste complète
+_SQL_LIST_ALL = """
+    SELECT id, number, date, customer_name, total_cents
+    FROM invoice
+    WHERE id < ?
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+_SQL_LIST_SEARCH = """
+    SELECT id, number, date, customer_name, total_cents
+    FROM invoice
+    WHERE (number LIKE ?1 OR customer_name LIKE ?1 OR date LIKE ?1) AND id < ?2
+    ORDER BY id DESC
+    LIMIT ?3
+"""
+
+_SQL_LIST_FTS = """
+    SELECT i.id, i.number, i.date, i.customer_name, i.total_cents
+    FROM invoice_fts f
+    JOIN invoice i ON i.id = f.rowid
+    WHERE invoice_fts MATCH ? AND i.id < ?
+    ORDER BY i.id DESC
+    LIMIT ?
+"""
+
+_SQL_GET_HEADER = """
+    SELECT
+        id, number, date,
+        customer_name, customer_address, customer_postal_code,
+        customer_email, customer_phone,
+        subtotal_cents, vat_rate, vat_cents, total_cents
+    FROM invoice
+    WHERE id = ?
+"""
+
+_SQL_GET_NUMBER = "SELECT number FROM invoice WHERE id = ?"
+
+_SQL_GET_NUMBER_CUSTOMER = "SELECT number, customer_name FROM invoice WHERE id = ?"
+
+_SQL_GET_LINES = """
+    SELECT id, invoice_id, position, reference, qty, description,
+           unit_price_cents, line_total_cents
+    FROM invoice_line
+    WHERE invoice_id = ?
+    ORDER BY position ASC
+"""
+
+_SQL_UPDATE_HEADER = f"""
+    UPDATE invoice
+    SET
+        number = ?,
+        date = ?,
+        customer_name = ?,
+        customer_address = ?,
+        customer_postal_code = ?,
+        customer_phone = ?,
+        customer_email = ?,
+        subtotal_cents = ?,
+        vat_rate = ?,
+        vat_cents = ?,
+        total_cents = ?,
+        updated_at = COALESCE(?, {SQL_NOW})
+    WHERE id = ?
+"""
+
+_SQL_INSERT_LINE = """
+    INSERT INTO invoice_line
+    (invoice_id, position, qty, reference, description, unit_price_cents, line_total_cents)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_COUNTER_VALUE = "SELECT value FROM counter WHERE key = 'invoice_number'"
+
+# Borne de la première page : plus grand id INTEGER SQLite (id < borne,
+# seul cet id extrême, jamais atteint par une table de factures, serait exclu)
+_MAX_ID = 2**63 - 1
+
+
+def _fts_query(search: str) -> str:
+    """
+    Saisie utilisateur -> requête FTS5 trigram.
+    La saisie entière devient une chaîne entre guillemets : même sémantique
+    que LIKE '%saisie%'. Retourne "" sous 3 caractères (non indexable en trigram).
+    """
+    if len(search) < 3:
+        return ""
+    return '"' + search.replace('"', '""') + '"'
+
+
+# Nombre de résultats (recherche, page) gardés en mémoire par list_invoices_page
+_LIST_CACHE_MAX = 32
+
+
+# INSERT brouillon : date, created_at, updated_at (toujours présentes) sont liées
+# à chaque appel ; les autres colonnes ont une valeur fixe, filtrée selon la DB réelle
+_DRAFT_STATIC_DEFAULTS = (
+    ("number", None),
+    ("customer_name", ""),
+    ("customer_address", ""),
+    ("customer_postal_code", ""),
+    ("customer_phone", ""),
+    ("customer_email", ""),
+    ("subtotal_cents", 0),
+    ("vat_rate", 20),
+    ("vat_cents", 0),
+    ("total_cents", 0),
+)
+
+
 class InvoiceRepository:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self.conn = conn
-
-    def list_invoices(self, search: str = "") -> List[InvoiceListItem]:
+        # Colonnes de la table invoice (figées après init_schema), lues à la demande
+        self._invoice_cols: Optional[set[str]] = None
+        self._draft_sql: Optional[Tuple[str, tuple]] = None
+        self._has_fts: Optional[bool] = None
+        # Résultats de list_invoices par saisie normalisée ; vidé dès que la
+        # connexion a écrit (total_changes couvre aussi les autres repositories)
+        self._list_cache: dict[Tuple[str, Optional[int], int], List[InvoiceListItem]] = {}
+        self._list_cache_ver = -1
+
+    def _tuple_cursor(self) -> sqlite3.Cursor:
+        # Lignes en tuples bruts (pas de sqlite3.Row) pour les listes : _make direct
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        return cur
+
+    def _list_cursor(
+        self,
+        search: str,
+        cur: Optional[sqlite3.Cursor] = None,
+        *,
+        before_id: Optional[int] = None,
+        limit: int = -1,
+    ) -> sqlite3.Cursor:
+        execute = (cur or self.conn).execute
         search = search.strip()
+        before = _MAX_ID if before_id is None else before_id
+        fts = _fts_query(search) if search and self._fts_available() else ""
+        if fts:
+            return execute(_SQL_LIST_FTS, (fts, before, limit))
         if search:
-            like = f"%{search}%"
-            cur = self.conn.execute(
-                """
-                SELECT id, number, date, customer_name, total_cents
-                FROM invoice
-                WHERE number LIKE ? OR customer_name LIKE ? OR date LIKE ?
-                ORDER BY id DESC
-                """,
-                (like, like, like),
-            )
-        else:
-            cur = self.conn.execute(
-                """
-                SELECT id, number, date, customer_name, total_cents
-                FROM invoice
-                ORDER BY id DESC
-                """
-            )
+            # Motif lié une seule fois (?1), réutilisé par les trois LIKE
+            return execute(_SQL_LIST_SEARCH, (f"%{search}%", before, limit))
+        return execute(_SQL_LIST_ALL, (before, limit))
+
+    def list_invoices_raw(self, search: str = "") -> List[sqlite3.Row]:
+        """
+        Même résultat que list_invoices, sans copie : lignes sqlite3.Row
+        (id, number, date, customer_name, total_cents), indexables par position ou nom.
+        """
+        return self._list_cursor(search).fetchall()
+
+    def list_invoices(self, search: str = "") -> List[InvoiceListItem]:
+        return self.list_invoices_page(search, None, -1)
+
+    def list_invoices_page(
+        self, search: str, before_id: Optional[int], limit: int
+    ) -> List[InvoiceListItem]:
+        """
+        Tranche de la liste (même ordre que list_invoices : id décroissant),
+        factures d'id < before_id (None : première page).
+        limit=-1 : jusqu'à la fin. Moins de `limit` lignes => dernière page.
+        """
+        key = ((search or "").strip(), before_id, limit)
+        if self._list_cache_ver != self.conn.total_changes:
+            self._list_cache.clear()
+            self._list_cache_ver = self.conn.total_changes
+        rows = self._list_cache.get(key)
+        if rows is None:
+            # L'ordre des colonnes du SELECT suit celui des champs : _make direct,
+            # en itérant le curseur (pas de liste intermédiaire fetchall)
+            make = InvoiceListItem._make
+            cur = self._list_cursor(key[0], self._tuple_cursor(), before_id=before_id, limit=limit)
+            rows = [make(row) for row in cur]
+            if len(self._list_cache) >= _LIST_CACHE_MAX:
+                self._list_cache.clear()
+            self._list_cache[key] = rows
+        # Copie superficielle : l'appelant peut modifier sa liste sans toucher au cache
+        return list(rows)
 
-        return [
-            InvoiceListItem(
-                id=row["id"],
-                number=row["number"],
-                date=row["date"],
-                customer_name=row["customer_name"],
-                total_cents=row["total_cents"],
-            )
-            for row in cur.fetchall()
-        ]
-        
     def next_invoice_number(self) -> str:
-        row = self.conn.execute(
-            "SELECT value FROM counter WHERE key = 'invoice_number'"
-        ).fetchone()
+        row = self.conn.execute(_SQL_COUNTER_VALUE).fetchone()
         if not row:
             raise RuntimeError("Compteur invoice_number introuvable (table counter).")
         return f"{int(row['value']):03d}"
@@ -95,61 +240,57 @@ class InvoiceRepository:
         )
 
 
-    def create_draft(self, date_iso: str) -> int:
+    def _fts_available(self) -> bool:
+        if self._has_fts is None:
+            self._has_fts = (
+                self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='invoice_fts'"
+                ).fetchone()
+                is not None
+            )
+        return self._has_fts
+
+    def _invoice_columns(self) -> set[str]:
+        if self._invoice_cols is None:
+            self._invoice_cols = {
+                r["name"] for r in self.conn.execute("PRAGMA table_info(invoice)")
+            }
+        return self._invoice_cols
+
+    def _draft_insert(self) -> Tuple[str, tuple]:
+        """
+        SQL + valeurs fixes de l'INSERT brouillon, construits une seule fois.
+        Les paramètres variables (date, created_at, updated_at) viennent en tête ;
+        created_at / updated_at valent maintenant (côté SQLite) s'ils sont NULL.
+        """
+        if self._draft_sql is None:
+            cols_in_db = self._invoice_columns()
+            static = [(c, v) for c, v in _DRAFT_STATIC_DEFAULTS if c in cols_in_db]
+            cols = ["date", "created_at", "updated_at"] + [c for c, _v in static]
+            now = f"COALESCE(?, {SQL_NOW})"
+            placeholders = ", ".join(["?", now, now] + ["?"] * len(static))
+            col_list = ", ".join(cols)
+            self._draft_sql = (
+                f"INSERT INTO invoice ({col_list}) VALUES ({placeholders})",
+                tuple(v for _c, v in static),
+            )
+        return self._draft_sql
+
+    def create_draft(self, date_iso: str, *, now_iso: Optional[str] = None) -> int:
         """
         Crée une facture en brouillon.
         Version robuste : construit l'INSERT selon les colonnes réellement présentes
         dans la table invoice (évite mismatch colonnes/valeurs).
+        now_iso : horodatage partagé (import par lot), sinon maintenant.
         """
-        now = datetime.now().isoformat(timespec="seconds")
-
-        cols_in_db = {
-            r["name"] for r in self.conn.execute("PRAGMA table_info(invoice)").fetchall()
-        }
-
-        defaults = {
-            "number": None,
-            "date": date_iso,
-            "customer_name": "",
-            "customer_address": "",
-            "customer_postal_code": "",
-            "customer_phone": "",
-            "customer_email": "",
-            "subtotal_cents": 0,
-            "vat_rate": 20,
-            "vat_cents": 0,
-            "total_cents": 0,
-            "created_at": now,
-            "updated_at": now,
-        }
-
-        cols = [c for c in defaults.keys() if c in cols_in_db]
-        values = [defaults[c] for c in cols]
-
-        placeholders = ", ".join(["?"] * len(cols))
-        col_list = ", ".join(cols)
-
-        cur = self.conn.execute(
-            f"INSERT INTO invoice ({col_list}) VALUES ({placeholders})",
-            tuple(values),
-        )
+        sql, static_values = self._draft_insert()
+        cur = self.conn.execute(sql, (date_iso, now_iso, now_iso) + static_values)
         self.conn.commit()
         return int(cur.lastrowid)
 
 
     def get_header(self, invoice_id: int) -> InvoiceHeader:
-        cur = self.conn.execute(
-            """
-            SELECT
-                id, number, date,
-                customer_name, customer_address, customer_postal_code,
-                customer_email, customer_phone,
-                subtotal_cents, vat_rate, vat_cents, total_cents
-            FROM invoice
-            WHERE id = ?
-            """,
-            (invoice_id,),
-        )
+        cur = self.conn.execute(_SQL_GET_HEADER, (invoice_id,))
         row = cur.fetchone()
         if not row:
             raise ValueError("Facture introuvable.")
@@ -168,30 +309,25 @@ class InvoiceRepository:
             total_cents=row["total_cents"],
         )
 
+    def get_number_customer(self, invoice_id: int) -> Tuple[Optional[str], str]:
+        """
+        (number, customer_name) seuls : lecture étroite pour les noms de fichier
+        et le partage, sans charger l'en-tête complet.
+        """
+        row = self.conn.execute(_SQL_GET_NUMBER_CUSTOMER, (invoice_id,)).fetchone()
+        if not row:
+            raise ValueError("Facture introuvable.")
+        return row["number"], row["customer_name"]
+
+    def iter_lines(self, invoice_id: int) -> Iterator[InvoiceLine]:
+        """
+        Lignes produites au fil du curseur (rendu PDF) : la liste complète
+        n'est jamais construite.
+        """
+        return map(InvoiceLine._make, self._tuple_cursor().execute(_SQL_GET_LINES, (invoice_id,)))
+
     def get_lines(self, invoice_id: int) -> List[InvoiceLine]:
-        cur = self.conn.execute(
-            """
-            SELECT id, invoice_id, position, reference, qty, description,
-                   unit_price_cents, line_total_cents
-            FROM invoice_line
-            WHERE invoice_id = ?
-            ORDER BY position ASC
-            """,
-            (invoice_id,),
-        )
-        return [
-            InvoiceLine(
-                id=row["id"],
-                invoice_id=row["invoice_id"],
-                position=row["position"],
-                reference=row["reference"],
-                qty=row["qty"],
-                description=row["description"],
-                unit_price_cents=row["unit_price_cents"],
-                line_total_cents=row["line_total_cents"],
-            )
-            for row in cur.fetchall()
-        ]
+        return list(self.iter_lines(invoice_id))
 
     def save_invoice(
         self,
@@ -208,77 +344,62 @@ class InvoiceRepository:
         vat_rate: int,
         vat_cents: int,
         total_cents: int,
-        lines: list[tuple],
-    ) -> None:
-        now = datetime.now().isoformat(timespec="seconds")
-
+        lines: list[tuple[int, str, str, int, int]],
+        now_iso: str | None = None,
+    ) -> str:
+        """
+        lines: (qty, reference, description, unit_price_cents, line_total_cents)
+        Les montants et quantités sont déjà des int (convertis par l'éditeur) :
+        aucune conversion n'est refaite ici, seuls les textes sont nettoyés (strip).
+        now_iso : horodatage partagé (import par lot), sinon maintenant.
+        Retourne le numéro enregistré (attribué automatiquement s'il était vide).
+        """
         number = (number or "").strip()
 
-        # 🔁 AUTO-INCRÉMENT SI NUMÉRO VIDE
-        if not number:
-            number = self.next_invoice_number()
-            self.bump_invoice_number()
-
-        self.conn.execute(
-            """
-            UPDATE invoice
-            SET
-                number = ?,
-                date = ?,
-                customer_name = ?,
-                customer_address = ?,
-                customer_postal_code = ?,
-                customer_phone = ?,
-                customer_email = ?,
-                subtotal_cents = ?,
-                vat_rate = ?,
-                vat_cents = ?,
-                total_cents = ?,
-                updated_at = ?
-            WHERE id = ?
-            """,
-            (
-                number,
-                date_iso,
-                customer_name.strip(),
-                customer_address.strip(),
-                customer_postal_code.strip(),
-                customer_phone.strip(),
-                customer_email.strip(),
-                int(subtotal_cents),
-                int(vat_rate),
-                int(vat_cents),
-                int(total_cents),
-                now,
-                invoice_id,
-            ),
-        )
+        # Une seule transaction (un seul commit) pour l'en-tête et les lignes.
+        # IMMEDIATE : verrou d'écriture pris d'emblée (pas de SQLITE_BUSY en cours de route)
+        with self.conn:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+            # 🔁 AUTO-INCRÉMENT SI NUMÉRO VIDE
+            if not number:
+                number = self.next_invoice_number()
+                self.bump_invoice_number()
 
-        # 🔁 Lignes
-        self.conn.execute("DELETE FROM invoice_line WHERE invoice_id = ?", (invoice_id,))
-        for pos, (qty, ref, desc, unit_cents, total_cents) in enumerate(lines, start=1):
             self.conn.execute(
-                """
-                INSERT INTO invoice_line
-                (invoice_id, position, qty, reference, description, unit_price_cents, line_total_cents)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
+                _SQL_UPDATE_HEADER,
                 (
-                    invoice_id,
-                    pos,
-                    int(qty),
-                    ref.strip(),
-                    desc.strip(),
-                    int(unit_cents),
+                    number,
+                    date_iso,
+                    customer_name.strip(),
+                    customer_address.strip(),
+                    customer_postal_code.strip(),
+                    customer_phone.strip(),
+                    customer_email.strip(),
+                    int(subtotal_cents),
+                    int(vat_rate),
+                    int(vat_cents),
                     int(total_cents),
+                    now_iso,
+                    invoice_id,
                 ),
             )
 
-        self.conn.commit()
+            self.conn.execute("DELETE FROM invoice_line WHERE invoice_id = ?", (invoice_id,))
+            # 🔁 Lignes : générateur consommé par executemany, sans liste intermédiaire
+            strip = str.strip
+            self.conn.executemany(
+                _SQL_INSERT_LINE,
+                (
+                    (invoice_id, pos, qty, strip(ref), strip(desc), unit_cents, line_cents)
+                    for pos, (qty, ref, desc, unit_cents, line_cents) in enumerate(lines, start=1)
+                ),
+            )
+        return number
 
 
     def _next_number(self) -> str:
-        cur = self.conn.execute("SELECT value FROM counter WHERE key = 'invoice_number'")
+        cur = self.conn.execute(_SQL_COUNTER_VALUE)
         row = cur.fetchone()
         if not row:
             raise ValueError("Compteur de factures introuvable.")
@@ -291,37 +412,29 @@ class InvoiceRepository:
         except Exception:
             return
 
-        cur = self.conn.execute("SELECT value FROM counter WHERE key = 'invoice_number'")
-        row = cur.fetchone()
-        if not row:
-            return
-        current = int(row["value"])
-        target = max(current, used + 1)
-        if target != current:
-            self.conn.execute(
-                "UPDATE counter SET value = ? WHERE key = 'invoice_number'",
-                (target,),
-            )
+        # MAX évalué par SQLite : pas de SELECT préalable, écriture idempotente
+        self.conn.execute(
+            "UPDATE counter SET value = MAX(value, ?) WHERE key = 'invoice_number'",
+            (used + 1,),
+        )
 
     def finalize(self, invoice_id: int) -> str:
-        header = self.get_header(invoice_id)
-
-        number = (header.number or "").strip()
-        auto_generated = False
-
-        if auto_generated:
-            cur = self.conn.execute("SELECT value FROM counter WHERE key = 'invoice_number'")
-            n = int(cur.fetchone()["value"])
-            self.conn.execute(
-                "UPDATE counter SET value = ? WHERE key = 'invoice_number'",
-                (n + 1,),
-            )
-        else:
+        # Lecture puis écriture : IMMEDIATE évite l'escalade de verrou en cours de transaction
+        with self.conn:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+            # Seul le numéro est utile : pas de chargement de l'en-tête complet
+            row = self.conn.execute(_SQL_GET_NUMBER, (invoice_id,)).fetchone()
+            if not row:
+                raise ValueError("Facture introuvable.")
+
+            number = (row["number"] or "").strip()
             self._advance_counter_if_needed(number)
-
-        self.conn.commit()
         return number
 
     def delete(self, invoice_id: int) -> None:
-        self.conn.execute("DELETE FROM invoice WHERE id = ?", (invoice_id,))
-        self.conn.commit()
+        # Vérification et écriture en une seule instruction : rowcount indique si la facture existait
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM invoice WHERE id = ?", (invoice_id,))
+        if cur.rowcount == 0:
+            raise ValueError("Facture introuvable.")
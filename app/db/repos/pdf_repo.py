@@ -1,12 +1,11 @@
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
-@dataclass(frozen=True)
-class PdfExportItem:
+from app.db.db import SQL_NOW
+
+class PdfExportItem(NamedTuple):
     id: int
     invoice_id: int
     filename: str
@@ -14,90 +13,73 @@ class PdfExportItem:
     created_at: str
     kind: str
 
+
+# Texte SQL constant => réutilisation du cache de statements de la connexion
+_SQL_LIST_ALL = """
+    SELECT id, invoice_id, filename, rel_path, created_at, kind
+    FROM pdf_export
+    ORDER BY created_at DESC, id DESC
+"""
+
+_SQL_GET_BY_ID = """
+    SELECT id, invoice_id, filename, rel_path, created_at, kind
+    FROM pdf_export
+    WHERE id = ?
+"""
+
+_SQL_TOUCH = f"""
+    UPDATE pdf_export
+    SET created_at = {SQL_NOW}, rel_path = ?, kind = ?
+    WHERE invoice_id = ? AND filename = ?
+"""
+
+_SQL_INSERT = f"""
+    INSERT INTO pdf_export (invoice_id, filename, rel_path, created_at, kind)
+    VALUES (?, ?, ?, {SQL_NOW}, ?)
+"""
+
+
 class PdfExportRepository:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self.conn = conn
 
     def list_all(self) -> List[PdfExportItem]:
-        cur = self.conn.execute(
-            """
-            SELECT id, invoice_id, filename, rel_path, created_at, kind
-            FROM pdf_export
-            ORDER BY created_at DESC, id DESC
-            """
-        )
-        return [
-            PdfExportItem(
-                id=r["id"],
-                invoice_id=r["invoice_id"],
-                filename=r["filename"],
-                rel_path=r["rel_path"],
-                created_at=r["created_at"],
-                kind=r["kind"],
-            )
-            for r in cur.fetchall()
-        ]
+        # Colonnes du SELECT dans l'ordre des champs : _make direct sur le curseur
+        make = PdfExportItem._make
+        cur = self.conn.cursor()
+        cur.row_factory = None  # tuples bruts : pas de sqlite3.Row intermédiaire
+        return [make(r) for r in cur.execute(_SQL_LIST_ALL)]
 
     def get_by_id(self, pdf_id: int) -> Optional[PdfExportItem]:
-        r = self.conn.execute(
-            """
-            SELECT id, invoice_id, filename, rel_path, created_at, kind
-            FROM pdf_export
-            WHERE id = ?
-            """,
-            (pdf_id,),
-        ).fetchone()
+        r = self.conn.execute(_SQL_GET_BY_ID, (pdf_id,)).fetchone()
         if not r:
             return None
-        return PdfExportItem(
-            id=r["id"],
-            invoice_id=r["invoice_id"],
-            filename=r["filename"],
-            rel_path=r["rel_path"],
-            created_at=r["created_at"],
-            kind=r["kind"],
-        )
+        return PdfExportItem._make(r)
 
     def add_or_touch(self, *, invoice_id: int, filename: str, rel_path: str, kind: str = "INVOICE") -> None:
-        now = datetime.now().isoformat(timespec="seconds")
-        cur = self.conn.execute(
-            """
-            UPDATE pdf_export
-            SET created_at = ?, rel_path = ?, kind = ?
-            WHERE invoice_id = ? AND filename = ?
-            """,
-            (now, rel_path, kind, invoice_id, filename),
-        )
-        if cur.rowcount == 0:
-            self.conn.execute(
-                """
-                INSERT INTO pdf_export (invoice_id, filename, rel_path, created_at, kind)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (invoice_id, filename, rel_path, now, kind),
-            )
-        self.conn.commit()
+        # Une transaction d'écriture (IMMEDIATE) pour UPDATE + INSERT éventuel
+        with self.conn:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+            cur = self.conn.execute(_SQL_TOUCH, (rel_path, kind, invoice_id, filename))
+            if cur.rowcount == 0:
+                self.conn.execute(_SQL_INSERT, (invoice_id, filename, rel_path, kind))
 
     def delete(self, pdf_id: int) -> None:
         self.conn.execute("DELETE FROM pdf_export WHERE id = ?", (pdf_id,))
         self.conn.commit()
 
     def replace_invoice_export(self, *, invoice_id: int, filename: str, rel_path: str) -> None:
-        now = datetime.now().isoformat(timespec="seconds")
-
-        # Supprimer l'ancien export INVOICE de cette facture
-        self.conn.execute(
-            "DELETE FROM pdf_export WHERE invoice_id = ? AND kind = 'INVOICE'",
-            (invoice_id,),
-        )
-
-        # Insérer le nouveau
-        self.conn.execute(
-            """
-            INSERT INTO pdf_export (invoice_id, filename, rel_path, created_at, kind)
-            VALUES (?, ?, ?, ?, 'INVOICE')
-            """,
-            (invoice_id, filename, rel_path, now),
-        )
-        self.conn.commit()
+        with self.conn:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+
+            # Supprimer l'ancien export INVOICE de cette facture
+            self.conn.execute(
+                "DELETE FROM pdf_export WHERE invoice_id = ? AND kind = 'INVOICE'",
+                (invoice_id,),
+            )
+
+            # Insérer le nouveau
+            self.conn.execute(_SQL_INSERT, (invoice_id, filename, rel_path, "INVOICE"))
 
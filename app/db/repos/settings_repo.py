@@ -3,9 +3,31 @@ from __future__ import annotations
 import sqlite3
 
 
+# Texte SQL constant => réutilisation du cache de statements de la connexion
+_SQL_GET = """
+    SELECT
+      garage_name,
+      garage_address,
+      garage_postal_code,
+      garage_phone,
+      garage_siret,
+      garage_email,
+      onedrive_backup_dir,
+      COALESCE(last_backup_at,'') AS last_backup_at
+    FROM settings
+    WHERE id = 1
+"""
+
+_SQL_UPDATE_LAST_BACKUP = "UPDATE settings SET last_backup_at = ? WHERE id = 1"
+
+
 class SettingsRepository:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self.conn = conn
+        # Dernier résultat de get(), valable tant que la connexion n'a rien écrit
+        # (total_changes couvre aussi les écritures faites par une autre instance)
+        self._cached: dict[str, str] | None = None
+        self._cached_ver = -1
         self._ensure_columns()
 
     def _has_column(self, table: str, column: str) -> bool:
@@ -24,21 +46,11 @@ class SettingsRepository:
             self.conn.commit()
 
     def get(self) -> dict[str, str]:
-        row = self.conn.execute(
-            """
-            SELECT
-              garage_name,
-              garage_address,
-              garage_postal_code,
-              garage_phone,
-              garage_siret,
-              garage_email,
-              onedrive_backup_dir,
-              COALESCE(last_backup_at,'') AS last_backup_at
-            FROM settings
-            WHERE id = 1
-            """
-        ).fetchone()
+        if self._cached is not None and self._cached_ver == self.conn.total_changes:
+            # Copie : l'appelant peut modifier le dict sans toucher au cache
+            return dict(self._cached)
+
+        row = self.conn.execute(_SQL_GET).fetchone()
 
         if not row:
             self.conn.execute("INSERT OR IGNORE INTO settings (id) VALUES (1)")
@@ -54,7 +66,7 @@ class SettingsRepository:
                 "last_backup_at": "",
             }
 
-        return {
+        self._cached = {
             "garage_name": row["garage_name"] or "",
             "garage_address": row["garage_address"] or "",
             "garage_postal_code": row["garage_postal_code"] or "",
@@ -64,13 +76,16 @@ class SettingsRepository:
             "onedrive_backup_dir": row["onedrive_backup_dir"] or "",
             "last_backup_at": row["last_backup_at"] or "",
         }
+        self._cached_ver = self.conn.total_changes
+        return dict(self._cached)
 
-    def update_last_backup(self, created_at_iso: str) -> None:
-        self.conn.execute(
-            "UPDATE settings SET last_backup_at = ? WHERE id = 1",
-            (created_at_iso,),
-        )
-        self.conn.commit()
+    def update_last_backup(self, created_at_iso: str, *, commit: bool = True) -> None:
+        """
+        commit=False : l'appelant regroupe l'écriture dans sa propre transaction.
+        """
+        self.conn.execute(_SQL_UPDATE_LAST_BACKUP, (created_at_iso,))
+        if commit:
+            self.conn.commit()
 
     def update(
         self,
@@ -106,3 +121,4 @@ class SettingsRepository:
             ),
         )
         self.conn.commit()
+        self._cached = None
@@ -64,7 +64,7 @@ CREATE TABLE IF NOT EXISTS invoice_line (
   FOREIGN KEY (invoice_id) REFERENCES invoice(id) ON DELETE CASCADE
 );
 
-CREATE INDEX IF NOT EXISTS idx_invoice_line_invoice_id ON invoice_line(invoice_id);
+-- (invoice_id, position) sert aussi les recherches par invoice_id et l'ORDER BY position
 CREATE UNIQUE INDEX IF NOT EXISTS uq_invoice_line_position ON invoice_line(invoice_id, position);
 
 -- =========================
@@ -80,8 +80,10 @@ CREATE TABLE IF NOT EXISTS pdf_export (
   FOREIGN KEY (invoice_id) REFERENCES invoice(id) ON DELETE CASCADE
 );
 
-CREATE INDEX IF NOT EXISTS idx_pdf_export_invoice_id ON pdf_export(invoice_id);
-CREATE INDEX IF NOT EXISTS idx_pdf_export_created_at ON pdf_export(created_at);
+-- (invoice_id, kind) : remplacement de l'export INVOICE d'une facture
+CREATE INDEX IF NOT EXISTS idx_pdf_export_invoice_kind ON pdf_export(invoice_id, kind);
+-- Même ordre que la liste des PDF (ORDER BY created_at DESC, id DESC) : pas de tri
+CREATE INDEX IF NOT EXISTS idx_pdf_export_created_at_id ON pdf_export(created_at DESC, id DESC);
 
 CREATE UNIQUE INDEX IF NOT EXISTS uq_pdf_export_invoice_filename
 ON pdf_export(invoice_id, filename);
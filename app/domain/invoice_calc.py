@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from operator import mul
 from typing import List, Tuple
 
 
@@ -9,8 +10,10 @@ def calc_totals(lines: List[Tuple[int, int]]) -> tuple[int, int, int]:
     returns: subtotal_cents, vat_cents, total_cents
     """
     subtotal = 0
-    for qty, up in lines:
-        subtotal += int(qty) * int(up)
+    if lines:
+        # Produit scalaire évalué en C (map/sum), sans boucle Python
+        qtys, ups = zip(*lines)
+        subtotal = sum(map(mul, map(int, qtys), map(int, ups)))
 
     vat = (subtotal * 20) // 100
     total = subtotal + vat
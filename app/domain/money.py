@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 
+# Compilé une seule fois (groupe non capturant)
+_PRICE_RE = re.compile(r"\d+(?:\.\d{0,2})?")
 
+
+@lru_cache(maxsize=1024)
 def euros_to_cents(text: str) -> int:
     """
     Convertit une saisie utilisateur en centimes.
@@ -11,19 +16,19 @@ def euros_to_cents(text: str) -> int:
     s = (text or "").strip().replace("€", "").strip()
     if not s:
         return 0
+    # Cas courant (entier) sans regex ; isascii() écarte les chiffres Unicode
+    if s.isascii() and s.isdigit():
+        return int(s) * 100
     s = s.replace(",", ".")
-    if not re.fullmatch(r"\d+(\.\d{0,2})?", s):
+    if not _PRICE_RE.fullmatch(s):
         raise ValueError("Prix invalide. Exemple: 12,50")
-    if "." in s:
-        euros, dec = s.split(".", 1)
-        dec = (dec + "00")[:2]
-    else:
-        euros, dec = s, "00"
-    return int(euros) * 100 + int(dec)
+    euros, _, dec = s.partition(".")
+    return int(euros) * 100 + int((dec + "00")[:2])
 
 
+@lru_cache(maxsize=4096)
 def cents_to_euros(cents: int) -> str:
+    # Mémoïsé : les mêmes montants reviennent à chaque rafraîchissement de liste
     cents = int(cents)
-    sign = "-" if cents < 0 else ""
-    cents = abs(cents)
-    return f"{sign}{cents // 100}.{cents % 100:02d} €"
+    euros, rest = divmod(abs(cents), 100)
+    return f"{'-' if cents < 0 else ''}{euros}.{rest:02d} €"
@@ -1,34 +1,37 @@
 from __future__ import annotations
 
+import multiprocessing
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool
 from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget, QStyle, QTabBar
+from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget, QStyle, QTabBar, QWidget
 
-from app.db.db import connect, init_schema
+from app.db.db import init_schema
+from app.db.pool import ConnectionPool, ReadPool
 from app.utils.paths import app_data_dir
 
 from app.db.repos.invoice_repo import InvoiceRepository
 from app.db.repos.settings_repo import SettingsRepository
 from app.db.repos.pdf_repo import PdfExportRepository
 
-from app.backup.backup_scheduler import BackupScheduler
-from app.backup.backup_manager import BackupManager
-
 from app.ui.invoices.invoice_list import InvoiceListWidget
-from app.ui.invoices.invoice_editor import InvoiceEditorWidget
-from app.ui.pdfs.pdf_list import PdfListWidget
 
 from app.ui.settings.main_window import SettingsWidget
 
+if TYPE_CHECKING:
+    # Importés à la demande (éditeur => reportlab) pour accélérer le démarrage
+    from app.ui.invoices.invoice_editor import InvoiceEditorWidget
+
 
 class MainWindow(QMainWindow):
-    def __init__(self, conn, parent=None) -> None:
+    def __init__(self, conn, read_pool: ReadPool | None = None, parent=None) -> None:
         super().__init__(parent)
 
         self.conn = conn
+        self.read_pool = read_pool
         self.setWindowTitle("HA Facturation")
 
         # =========================
@@ -54,6 +57,7 @@ class MainWindow(QMainWindow):
         backup_manager = BackupManager()
         self.backup = BackupScheduler(
             conn=conn,
+            read_pool=read_pool,
             settings_repo=self.settings_repo,
             backup_manager=backup_manager,
             interval_minutes=30,
@@ -85,10 +89,12 @@ class MainWindow(QMainWindow):
         self.idx_invoices = self.tabs.addTab(self.invoice_list_tab, "Factures")
         self._hide_close_button(self.idx_invoices)
 
-        # ---- PDF
-        self.pdf_list_tab = PdfListWidget(self.pdf_repo, conn=conn)
+        # ---- PDF (créé au premier affichage de l'onglet)
+        self.pdf_list_tab: QWidget = QWidget()
+        self._pdf_tab_loaded = False
         self.idx_pdfs = self.tabs.addTab(self.pdf_list_tab, "PDF")
         self._hide_close_button(self.idx_pdfs)
+        self.tabs.currentChanged.connect(self._on_current_tab_changed)
 
         # Ouvrir directement l'onglet Factures
         self.tabs.setCurrentIndex(self.idx_invoices)
@@ -98,13 +104,26 @@ class MainWindow(QMainWindow):
         if icon_png.exists():
             self.setWindowIcon(QIcon(str(icon_png)))
 
-    def update_last_backup(self, created_at_iso: str) -> None:
-        self.conn.execute(
-            "UPDATE settings SET last_backup_at = ? WHERE id = 1",
-            (created_at_iso,),
-        )
-        self.conn.commit()
-    
+    def _on_current_tab_changed(self, index: int) -> None:
+        if index != self.idx_pdfs or self._pdf_tab_loaded:
+            return
+        self._pdf_tab_loaded = True
+
+        from app.ui.pdfs.pdf_list import PdfListWidget
+
+        placeholder = self.pdf_list_tab
+        self.pdf_list_tab = PdfListWidget(self.pdf_repo, conn=self.conn)
+        self.settings_tab.settings_saved.connect(self.pdf_list_tab.reload_settings)
+
+        # Remplace le widget provisoire à la même position (sans re-déclencher ce slot)
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(self.idx_pdfs)
+        self.tabs.insertTab(self.idx_pdfs, self.pdf_list_tab, "PDF")
+        self._hide_close_button(self.idx_pdfs)
+        self.tabs.setCurrentIndex(self.idx_pdfs)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
     def _hide_close_button(self, tab_index: int) -> None:
         bar = self.tabs.tabBar()
         bar.setTabButton(tab_index, QTabBar.ButtonPosition.LeftSide, None)
@@ -126,11 +145,14 @@ class MainWindow(QMainWindow):
                 # widget plus présent (onglet fermé) -> cleanup
                 self._open_invoice_editors.pop(invoice_id, None)
 
+        from app.ui.invoices.invoice_editor import InvoiceEditorWidget
+
         editor = InvoiceEditorWidget(
             repo=self.invoice_repo,
             backup_scheduler=self.backup,
             pdf_repo=self.pdf_repo,
             invoice_id=invoice_id,
+            read_pool=self.read_pool,
         )
 
         idx = self.tabs.addTab(editor, "Facture")
@@ -189,6 +211,8 @@ class MainWindow(QMainWindow):
 
 
 def main() -> int:
+    # Exe PyInstaller : nécessaire avant tout pool de processus (rendu PDF par lot)
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
 
     # Icône globale (taskbar)
@@ -197,14 +221,22 @@ def main() -> int:
         app.setWindowIcon(QIcon(str(icon_png)))
 
     db_path = app_data_dir() / "app.db"
-    conn = connect(db_path)
+    # Une connexion d'écriture (UI) + des lecteurs lecture seule (sauvegarde)
+    pool = ConnectionPool(db_path)
+    conn = pool.writer
     init_schema(conn)
 
-    win = MainWindow(conn)
+    win = MainWindow(conn, pool.read_pool)
     win.resize(1100, 720)
     win.show()
 
-    return app.exec()
+    try:
+        return app.exec()
+    finally:
+        # Sauvegarde ou export PDF encore en cours dans le pool de threads :
+        # attendre la fin avant de fermer leurs connexions lecture seule
+        QThreadPool.globalInstance().waitForDone()
+        pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from app.pdf.render_invoice import PdfResult, render_invoice_pdf
+
+
+def _render_one(db_path: str, invoice_id: int, out_path: str) -> PdfResult:
+    """
+    Exécuté dans un processus du pool : une connexion sqlite3 ne traverse pas
+    les processus, chaque rendu ouvre donc la base en lecture seule.
+    """
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON;")
+        conn.execute("PRAGMA mmap_size = 268435456;")
+        return render_invoice_pdf(conn=conn, invoice_id=invoice_id, out_path=Path(out_path))
+    finally:
+        conn.close()
+
+
+def render_batch(
+    db_path: Path,
+    invoice_ids: Sequence[int],
+    out_dir: Path,
+    *,
+    workers: Optional[int] = None,
+) -> List[PdfResult]:
+    """
+    Rend plusieurs factures en parallèle (un processus par cœur par défaut).
+    Fichiers : out_dir/Facture_<id>.pdf. Résultats dans l'ordre de invoice_ids.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if not invoice_ids:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    db = str(db_path)
+    paths = [str(out_dir / f"Facture_{invoice_id}.pdf") for invoice_id in invoice_ids]
+
+    # Une seule facture : pas de coût de démarrage d'un pool
+    if len(invoice_ids) == 1 or workers == 1:
+        return [_render_one(db, i, p) for i, p in zip(invoice_ids, paths)]
+
+    chunksize = max(1, len(invoice_ids) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(
+                _render_one,
+                [db] * len(invoice_ids),
+                invoice_ids,
+                paths,
+                chunksize=chunksize,
+            )
+        )
@@ -2,20 +2,127 @@ from __future__ import annotations
 
 import sqlite3
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
 
-from app.db.repos.invoice_repo import InvoiceRepository
+from app.db.repos.invoice_repo import InvoiceLine, InvoiceRepository
 from app.db.repos.settings_repo import SettingsRepository
 from app.domain.money import cents_to_euros
 from app.utils.dates import iso_to_fr
 
 
+# =========================
+# Géométrie (en points), calculée une seule fois au chargement du module
+# =========================
+_PAGE_W, _PAGE_H = A4
+_MARGIN = 20 * mm
+_LEFT = _MARGIN
+_RIGHT = _PAGE_W - _MARGIN
+_TOP = _PAGE_H - _MARGIN
+_BOTTOM = _MARGIN
+
+_LOGO_PATH = Path(__file__).resolve().parents[1] / "assets" / "ha_autos_logo.png"
+_LOGO_W = 40 * mm
+_LOGO_H = 40 * mm
+_LOGO_Y = _TOP - _LOGO_H + 23 * mm
+# Résolution d'impression du logo : au-delà, les pixels sont invisibles mais alourdissent le PDF
+_LOGO_DPI = 300
+
+_TITLE = "FACTURE"
+# Police standard (métriques AFM intégrées à reportlab) : largeur constante
+_TITLE_X = (_PAGE_W - stringWidth(_TITLE, "Helvetica-Bold", 16)) / 2
+_TITLE_Y = _TOP - 4 * mm
+_HEADER_RULE_Y = _TOP - 10 * mm
+
+_GARAGE_TOP = _TOP - 30 * mm
+_GARAGE_DY = 5.5 * mm
+_GARAGE_KEYS = (
+    "garage_name",
+    "garage_address",
+    "garage_postal_code",
+    "garage_phone",
+    "garage_email",
+    "garage_siret",
+)
+# Lignes du bloc garage en Helvetica 10, dans l'ordre d'affichage
+_GARAGE_LINE_KEYS = _GARAGE_KEYS[1:5]
+
+_META_W = 42 * mm
+_META_H = 18 * mm
+_META_X = _RIGHT - _META_W
+_META_Y = _GARAGE_TOP - 2 * mm - _META_H
+
+_BILL_W = 60 * mm
+_BILL_H = 43 * mm
+_BILL_X = _RIGHT - _BILL_W
+_BILL_Y = _META_Y - _BILL_H - 5 * mm
+_BILL_DY = 6 * mm
+# Champs client affichés dans "Facturer à", dans l'ordre
+_CUSTOMER_KEYS = (
+    "customer_name",
+    "customer_address",
+    "customer_postal_code",
+    "customer_phone",
+    "customer_email",
+)
+
+_BOX_PAD = 4 * mm  # retrait du texte dans les encadrés
+_CELL_PAD = 2 * mm  # retrait du texte dans les cellules
+_TEXT_DY = 5 * mm  # ligne de base du texte sous le haut d'une ligne
+_WRAP_DY = 4.5 * mm  # interligne des textes coupés (référence / description)
+
+# Tableau
+_TABLE_X = _LEFT
+_TABLE_Y_TOP = _BILL_Y - 15 * mm
+_TABLE_W = _RIGHT - _LEFT
+_W_QTY = 18 * mm
+_W_REF = 28 * mm
+_W_UNIT = 30 * mm
+_W_TOTAL = 28 * mm
+_W_DESC = _TABLE_W - (_W_QTY + _W_REF + _W_UNIT + _W_TOTAL)
+_X_QTY = _TABLE_X
+_X_REF = _X_QTY + _W_QTY
+_X_DESC = _X_REF + _W_REF
+_X_UNIT = _X_DESC + _W_DESC
+_X_TOTAL = _X_UNIT + _W_UNIT
+_X_END = _X_TOTAL + _W_TOTAL
+_ROW_H = 7 * mm
+# Abscisses du texte dans les cellules (gauche : qté/réf/desc, droite : prix/total)
+_TX_QTY = _X_QTY + _CELL_PAD
+_TX_REF = _X_REF + _CELL_PAD
+_TX_DESC = _X_DESC + _CELL_PAD
+_TX_UNIT_R = _X_UNIT + _W_UNIT - _CELL_PAD
+_TX_TOTAL_R = _X_END - _CELL_PAD
+# Abscisses des traits verticaux du tableau (bords + séparateurs de colonnes)
+_GRID_XS = (_TABLE_X, _X_REF, _X_DESC, _X_UNIT, _X_TOTAL, _X_END)
+
+# Réserver de la place sous le tableau (totaux + message)
+_RESERVED_UNDER_TABLE = 48 * mm
+_EMPTY_BOTTOM = _BOTTOM + _RESERVED_UNDER_TABLE
+
+# Totaux
+_VALUE_X = _X_END - _CELL_PAD
+_LABEL_X = _VALUE_X - 20 * mm  # rapproché
+_TOTALS_Y = _EMPTY_BOTTOM - 10 * mm
+_TOTALS_DY = 6 * mm
+# (libellé, police, abscisse de départ du libellé aligné à droite sur _LABEL_X)
+_TOTALS_ROWS = tuple(
+    (label, font, _LABEL_X - stringWidth(label, font, 10))
+    for label, font in (
+        ("Sous-total (HT)", "Helvetica"),
+        ("TVA (20%)", "Helvetica"),
+        ("Total (TTC)", "Helvetica-Bold"),
+    )
+)
+
+
 @dataclass(frozen=True)
 class PdfResult:
     pdf_path: Path
@@ -23,6 +130,9 @@ class PdfResult:
 
 def _t(v) -> str:
     """Force une valeur en texte (évite le crash reportlab sur objets inattendus)."""
+    # Cas normal d'abord : valeurs texte venant de la base
+    if type(v) is str:
+        return v
     if v is None:
         return ""
     # Protection anti-erreur: quelqu’un a mis {"texte"} => set
@@ -34,12 +144,85 @@ def _t(v) -> str:
 
 
 def _wrap_n_chars(text: str, n: int) -> List[str]:
-    text = _t(text).strip()
-    if not text:
-        return [""]
-    if len(text) <= n:
+    """Coupe tous les n caractères. text : déjà converti et nettoyé (strip) par l'appelant."""
+    size = len(text)
+    if size <= n:
         return [text]
-    return [text[i : i + n] for i in range(0, len(text), n)]
+    return [text[i : i + n] for i in range(0, size, n)]
+
+
+@lru_cache(maxsize=4)
+def _logo_reader(path_str: str, mtime: float) -> ImageReader:
+    """
+    Logo décodé et réduit une seule fois (clé : chemin + date de modification).
+    Réduit à la taille imprimée (_LOGO_W à _LOGO_DPI) : moins de données par PDF.
+    """
+    from PIL import Image  # dépendance de reportlab (lecture des PNG)
+
+    with Image.open(path_str) as im:
+        im.load()
+        max_px = round(_LOGO_W / 72 * _LOGO_DPI)
+        if max(im.size) > max_px:
+            im.thumbnail((max_px, max_px), Image.LANCZOS)
+        else:
+            im = im.copy()
+    return ImageReader(im)
+
+
+def _logo() -> Optional[ImageReader]:
+    try:
+        mtime = _LOGO_PATH.stat().st_mtime
+    except OSError:
+        return None
+    try:
+        return _logo_reader(str(_LOGO_PATH), mtime)
+    except Exception:
+        # Logo illisible : le PDF est produit sans
+        return None
+
+
+def _layout_rows(lines: Iterable[InvoiceLine]) -> Tuple[List[tuple], List[float]]:
+    """
+    Mise en page du tableau (hauteur de chaque ligne selon le wrap), en une passe
+    sur les lignes : seuls les textes à dessiner sont conservés.
+    Retourne (rows, row_bottoms) ; row_bottoms[-1] = bas de la dernière ligne.
+    """
+    y = _TABLE_Y_TOP - _ROW_H
+    row_bottoms = [y]
+
+    # Wrap mémorisé le temps du rendu : références / libellés répétés d'une ligne à l'autre
+    wrap_cache: dict[tuple[str, int], List[str]] = {}
+
+    def wrap(text: str, n: int) -> List[str]:
+        key = (text, n)
+        parts = wrap_cache.get(key)
+        if parts is None:
+            parts = wrap_cache[key] = _wrap_n_chars(text, n)
+        return parts
+
+    # InvoiceLine (repository) : champs texte non NULL, montants entiers => accès direct
+    rows = []
+    for ln in lines:
+        # wrap référence/description
+        ref_lines = wrap(ln.reference.strip(), 14)
+        desc_lines = wrap(ln.description.strip(), 36)
+        nb = max(len(ref_lines), len(desc_lines), 1)
+        h = max(_ROW_H, (nb * _WRAP_DY) + _CELL_PAD)
+
+        rows.append(
+            (
+                y - _TEXT_DY,
+                str(ln.qty),
+                ref_lines,
+                desc_lines,
+                # Entiers en centimes : divmod + cache de cents_to_euros, sans passer par float
+                cents_to_euros(ln.unit_price_cents),
+                cents_to_euros(ln.line_total_cents),
+            )
+        )
+        y -= h
+        row_bottoms.append(y)
+    return rows, row_bottoms
 
 
 def render_invoice_pdf(
@@ -55,17 +238,23 @@ def render_invoice_pdf(
     invoice_repo = InvoiceRepository(conn)
 
     s = settings_repo.get()
-    inv = invoice_repo.get_header(invoice_id)
-    lines = invoice_repo.get_lines(invoice_id)
-
-    c = canvas.Canvas(str(out_path), pagesize=A4)
-    page_w, page_h = A4
-
-    # Marges
-    left = 20 * mm
-    right = page_w - 20 * mm
-    top = page_h - 20 * mm
-    bottom = 20 * mm
+    # En-tête + lignes dans une même transaction de lecture (instantané cohérent) ;
+    # les lignes sont mises en page au fil du curseur, sans liste intermédiaire.
+    # Transaction déjà ouverte par l'appelant : simple lecture dedans, sans la terminer.
+    own_txn = not conn.in_transaction
+    if own_txn:
+        conn.execute("BEGIN DEFERRED")
+    try:
+        inv = invoice_repo.get_header(invoice_id)
+        rows, row_bottoms = _layout_rows(invoice_repo.iter_lines(invoice_id))
+    finally:
+        if own_txn:
+            # Lecture seule : rien à valider, on libère l'instantané
+            conn.rollback()
+
+    # Flux de page compressés (zlib) quel que soit rl_config ; le PDF est écrit
+    # d'un bloc par c.save()
+    c = canvas.Canvas(str(out_path), pagesize=A4, pageCompression=1)
 
     # Styles
     table_line_w = 1.0
@@ -75,22 +264,18 @@ def render_invoice_pdf(
     # =========================
     # EN-TÊTE : logo à gauche + "FACTURE" centré
     # =========================
-    header_y = top
+    # Un seul stat() du logo par rendu (dans _logo, pour la clé de cache)
+    logo = _logo()
+    has_logo = logo is not None
 
-    logo_path = Path(__file__).resolve().parents[1] / "assets" / "ha_autos_logo.png"
-    logo_w = 40 * mm
-    logo_h = 40 * mm
-    logo_x = left
-    logo_y = header_y - logo_h + 23 * mm
-
-    if logo_path.exists():
+    if logo is not None:
         try:
             c.drawImage(
-                ImageReader(str(logo_path)),
-                logo_x,
-                logo_y,
-                width=logo_w,
-                height=logo_h,
+                logo,
+                _LEFT,
+                _LOGO_Y,
+                width=_LOGO_W,
+                height=_LOGO_H,
                 preserveAspectRatio=True,
                 mask="auto",
             )
@@ -99,235 +284,153 @@ def render_invoice_pdf(
             pass
 
     c.setFont("Helvetica-Bold", 16)
-    title = "FACTURE"
-    title_w = c.stringWidth(title, "Helvetica-Bold", 16)
-    c.drawString((page_w - title_w) / 2, header_y - 4 * mm, title)
+    c.drawString(_TITLE_X, _TITLE_Y, _TITLE)
 
     c.setLineWidth(header_line_w)
-    c.line(left, header_y - 10 * mm, right, header_y - 10 * mm)
+    c.line(_LEFT, _HEADER_RULE_Y, _RIGHT, _HEADER_RULE_Y)
     c.setLineWidth(table_line_w)
 
     # =========================
     # BLOC GARAGE (VISIBLE, à gauche sous l'entête)
     # =========================
-    garage_top = header_y - 30 * mm
-    text_x = left + (logo_w - 20 * mm) if logo_path.exists() else left
-    y = garage_top
+    text_x = _LEFT + (_LOGO_W - 20 * mm) if has_logo else _LEFT
+    y = _GARAGE_TOP
 
-    garage_name = _t(s.get("garage_name")).strip()
-    garage_addr = _t(s.get("garage_address")).strip()
-    garage_cp = _t(s.get("garage_postal_code")).strip()
-    garage_phone = _t(s.get("garage_phone")).strip()
-    garage_email = _t(s.get("garage_email")).strip()
-    garage_siret = _t(s.get("garage_siret")).strip()
+    g = {k: _t(s.get(k)).strip() for k in _GARAGE_KEYS}
 
     c.setFont("Helvetica-Bold", 11)
-    if garage_name:
-        c.drawString(text_x, y, garage_name)
-        y -= 5.5 * mm
+    if g["garage_name"]:
+        c.drawString(text_x, y, g["garage_name"])
+        y -= _GARAGE_DY
 
     c.setFont("Helvetica", 10)
-    if garage_addr:
-        c.drawString(text_x, y, garage_addr)
-        y -= 5.5 * mm
-    if garage_cp:
-        c.drawString(text_x, y, garage_cp)
-        y -= 5.5 * mm
-    if garage_phone:
-        c.drawString(text_x, y, garage_phone)
-        y -= 5.5 * mm
-    if garage_email:
-        c.drawString(text_x, y, garage_email)
-        y -= 5.5 * mm
-    if garage_siret:
+    for k in _GARAGE_LINE_KEYS:
+        if g[k]:
+            c.drawString(text_x, y, g[k])
+            y -= _GARAGE_DY
+    if g["garage_siret"]:
         c.setFont("Helvetica", 9)
-        c.drawString(text_x, y, f"{garage_siret}")
+        c.drawString(text_x, y, g["garage_siret"])
         c.setFont("Helvetica", 10)
 
     # =========================
     # DATE + N° (ENCADRÉ à droite)
     # =========================
-    meta_w = 42 * mm
-    meta_h = 18 * mm
-    meta_x = right - meta_w
-    meta_y = garage_top - 2 * mm - meta_h
-
-    c.rect(meta_x, meta_y, meta_w, meta_h, stroke=1, fill=0)
+    c.rect(_META_X, _META_Y, _META_W, _META_H, stroke=1, fill=0)
 
     inv_date = iso_to_fr(_t(getattr(inv, "date", "")))
     inv_number = _t(getattr(inv, "number", "")).strip()
 
     c.setFont("Helvetica", 10)
-    c.drawString(meta_x + 4 * mm, meta_y + meta_h - 7 * mm, f"Date : {inv_date}")
+    c.drawString(_META_X + _BOX_PAD, _META_Y + _META_H - 7 * mm, f"Date : {inv_date}")
     if inv_number:
-        c.drawString(meta_x + 4 * mm, meta_y + meta_h - 13 * mm, f"N° : {inv_number}")
+        c.drawString(_META_X + _BOX_PAD, _META_Y + _META_H - 13 * mm, f"N° : {inv_number}")
 
     # =========================
     # FACTURER À (encadré à droite, sous date)
     # =========================
-    bill_w = 60 * mm
-    bill_h = 43 * mm
-    bill_x = right - bill_w
-    bill_y = meta_y - bill_h - 5 * mm
-
-    c.rect(bill_x, bill_y, bill_w, bill_h, stroke=1, fill=0)
+    c.rect(_BILL_X, _BILL_Y, _BILL_W, _BILL_H, stroke=1, fill=0)
 
+    bill_text_x = _BILL_X + _BOX_PAD
     c.setFont("Helvetica-Bold", 11)
-    c.drawString(bill_x + 4 * mm, bill_y + bill_h - 7 * mm, "Facturer à :")
+    c.drawString(bill_text_x, _BILL_Y + _BILL_H - 7 * mm, "Facturer à :")
 
     c.setFont("Helvetica", 10)
-    y_b = bill_y + bill_h - 13 * mm
-
-    customer_name = _t(getattr(inv, "customer_name", "")).strip()
-    customer_addr = _t(getattr(inv, "customer_address", "")).strip()
-    customer_cp = _t(getattr(inv, "customer_postal_code", "")).strip()
-    customer_phone = _t(getattr(inv, "customer_phone", "")).strip()
-    customer_email = _t(getattr(inv, "customer_email", "")).strip()
-
-    if customer_name:
-        c.drawString(bill_x + 4 * mm, y_b, customer_name[:40])
-        y_b -= 6 * mm
-    if customer_addr:
-        c.drawString(bill_x + 4 * mm, y_b, customer_addr[:40])
-        y_b -= 6 * mm
-    if customer_cp:
-        c.drawString(bill_x + 4 * mm, y_b, customer_cp[:40])
-        y_b -= 6 * mm
-    if customer_phone:
-        c.drawString(bill_x + 4 * mm, y_b, customer_phone[:40])
-        y_b -= 6 * mm
-    if customer_email:
-        c.drawString(bill_x + 4 * mm, y_b, customer_email[:40])
+    y_b = _BILL_Y + _BILL_H - 13 * mm
+
+    for k in _CUSTOMER_KEYS:
+        value = _t(getattr(inv, k, "")).strip()
+        if value:
+            c.drawString(bill_text_x, y_b, value[:40])
+            y_b -= _BILL_DY
 
     # =========================
     # TABLEAU (avec Référence)
     # =========================
-    table_x = left
-    table_y_top = bill_y - 15 * mm
-    table_w = right - left
-
-    w_qty = 18 * mm
-    w_ref = 28 * mm
-    w_unit = 30 * mm
-    w_total = 28 * mm
-    w_desc = table_w - (w_qty + w_ref + w_unit + w_total)
-
-    x_qty = table_x
-    x_ref = x_qty + w_qty
-    x_desc = x_ref + w_ref
-    x_unit = x_desc + w_desc
-    x_total = x_unit + w_unit
-    x_end = x_total + w_total
-
-    row_h = 7 * mm
-
-    def draw_header(y_top: float) -> float:
-        c.rect(table_x, y_top - row_h, table_w, row_h, stroke=1, fill=0)
-        c.line(x_ref, y_top - row_h, x_ref, y_top)
-        c.line(x_desc, y_top - row_h, x_desc, y_top)
-        c.line(x_unit, y_top - row_h, x_unit, y_top)
-        c.line(x_total, y_top - row_h, x_total, y_top)
-
-        c.setFont("Helvetica-Bold", 10)
-        c.drawString(x_qty + 2 * mm, y_top - 5 * mm, "Qté")
-        c.drawString(x_ref + 2 * mm, y_top - 5 * mm, "Référence")
-        c.drawString(x_desc + 2 * mm, y_top - 5 * mm, "Description")
-        c.drawRightString(x_unit + w_unit - 2 * mm, y_top - 5 * mm, "Prix unitaire")
-        c.drawRightString(x_end - 2 * mm, y_top - 5 * mm, "Total")
-        return y_top - row_h
-
-    def draw_row(y_top: float, qty: str, ref: str, desc: str, unit: str, total: str) -> float:
-        # wrap référence/description
-        ref_lines = _wrap_n_chars(ref, 14)
-        desc_lines = _wrap_n_chars(desc, 36)
-        nb = max(len(ref_lines), len(desc_lines), 1)
-        h = max(row_h, (nb * 4.5 * mm) + 2 * mm)
-
-        c.rect(table_x, y_top - h, table_w, h, stroke=1, fill=0)
-        c.line(x_ref, y_top - h, x_ref, y_top)
-        c.line(x_desc, y_top - h, x_desc, y_top)
-        c.line(x_unit, y_top - h, x_unit, y_top)
-        c.line(x_total, y_top - h, x_total, y_top)
-
-        c.setFont("Helvetica", 10)
-        c.drawString(x_qty + 2 * mm, y_top - 5 * mm, _t(qty))
-
-        # Référence + Description sur plusieurs lignes
-        c.setFont("Helvetica", 9)
-        ty = y_top - 5 * mm
-        for i in range(nb):
-            if i < len(ref_lines) and ref_lines[i]:
-                c.drawString(x_ref + 2 * mm, ty, ref_lines[i])
-            if i < len(desc_lines) and desc_lines[i]:
-                c.drawString(x_desc + 2 * mm, ty, desc_lines[i])
-            ty -= 4.5 * mm
-
-        c.setFont("Helvetica", 10)
-        c.drawRightString(x_unit + w_unit - 2 * mm, y_top - 5 * mm, _t(unit))
-        c.drawRightString(x_end - 2 * mm, y_top - 5 * mm, _t(total))
-
-        return y_top - h
-
-    def draw_empty_area(y_top: float, y_bottom: float) -> None:
-        # Zone vide = uniquement verticales, pas d'horizontales internes
-        c.line(table_x, y_bottom, table_x, y_top)
-        c.line(x_end, y_bottom, x_end, y_top)
-        c.line(x_ref, y_bottom, x_ref, y_top)
-        c.line(x_desc, y_bottom, x_desc, y_top)
-        c.line(x_unit, y_bottom, x_unit, y_top)
-        c.line(x_total, y_bottom, x_total, y_top)
-
-    y = draw_header(table_y_top)
-
-    for ln in lines:
-        qty = _t(getattr(ln, "qty", ""))
-        ref = _t(getattr(ln, "reference", ""))
-        desc = _t(getattr(ln, "description", ""))
-        unit = f"{getattr(ln, 'unit_price_cents', 0)/100:.2f} €"
-        total = f"{getattr(ln, 'line_total_cents', 0)/100:.2f} €"
-        y = draw_row(y, qty, ref, desc, unit, total)
-
-    # Réserver de la place sous le tableau (totaux + message)
-    RESERVED_UNDER_TABLE = 48 * mm
-    table_bottom_limit = bottom + RESERVED_UNDER_TABLE
-
-    empty_bottom = table_bottom_limit
-    if y > empty_bottom:
-        draw_empty_area(y, empty_bottom)
-
-    # Ligne horizontale finale (bas du tableau)
-    c.line(table_x, empty_bottom, x_end, empty_bottom)
+    # En-tête du tableau
+    text_y = _TABLE_Y_TOP - _TEXT_DY
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(_TX_QTY, text_y, "Qté")
+    c.drawString(_TX_REF, text_y, "Référence")
+    c.drawString(_TX_DESC, text_y, "Description")
+    c.drawRightString(_TX_UNIT_R, text_y, "Prix unitaire")
+    c.drawRightString(_TX_TOTAL_R, text_y, "Total")
+    y = row_bottoms[-1]
+
+    # Texte en une passe par police : deux setFont pour tout le tableau.
+    # La grille est émise en un seul tracé ensuite.
+    # Méthodes liées une seule fois : les boucles ci-dessous sont le chemin chaud
+    draw_string = c.drawString
+    draw_right = c.drawRightString
+
+    # Qté / prix unitaire / total
+    c.setFont("Helvetica", 10)
+    for text_y, qty, _ref_lines, _desc_lines, unit, total in rows:
+        draw_string(_TX_QTY, text_y, qty)
+        draw_right(_TX_UNIT_R, text_y, unit)
+        draw_right(_TX_TOTAL_R, text_y, total)
+
+    # Référence + Description sur plusieurs lignes
+    c.setFont("Helvetica", 9)
+    for text_y, _qty, ref_lines, desc_lines, _unit, _total in rows:
+        ty = text_y
+        for part in ref_lines:
+            if part:
+                draw_string(_TX_REF, ty, part)
+            ty -= _WRAP_DY
+        ty = text_y
+        for part in desc_lines:
+            if part:
+                draw_string(_TX_DESC, ty, part)
+            ty -= _WRAP_DY
+
+    # Grille en un seul appel : haut du tableau, bas de chaque ligne, ligne finale
+    # (la zone vide sous les lignes n'a que des verticales).
+    # Extrémités carrées : angles pleins comme ceux d'un rect().
+    grid_bottom = min(y, _EMPTY_BOTTOM)
+    # Ligne finale omise si la dernière ligne du tableau tombe déjà dessus
+    if abs(y - _EMPTY_BOTTOM) > 0.01 * mm:
+        row_bottoms.append(_EMPTY_BOTTOM)
+    c.saveState()
+    c.setLineCap(2)
+    c.lines(
+        [(_TABLE_X, yy, _X_END, yy) for yy in (_TABLE_Y_TOP, *row_bottoms)]
+        + [(x, grid_bottom, x, _TABLE_Y_TOP) for x in _GRID_XS]
+    )
+    c.restoreState()
 
     # =========================
     # TOTAUX sous le tableau
     # =========================
-    after_table_y = empty_bottom - 10 * mm
-
-    value_x = x_end - 2 * mm
-    label_x = value_x - 20 * mm  # rapproché
-
-    line_step = 6 * mm
-    ty = after_table_y
-
-    c.setFont("Helvetica", 10)
-    c.drawRightString(label_x, ty, "Sous-total (HT)")
-    c.drawRightString(value_x, ty, cents_to_euros(getattr(inv, "subtotal_cents", 0)))
-    ty -= line_step
-
-    c.drawRightString(label_x, ty, "TVA (20%)")
-    c.drawRightString(value_x, ty, cents_to_euros(getattr(inv, "vat_cents", 0)))
-    ty -= line_step
-
-    c.setFont("Helvetica-Bold", 10)
-    c.drawRightString(label_x, ty, "Total (TTC)")
-    c.drawRightString(value_x, ty, cents_to_euros(getattr(inv, "total_cents", 0)))
-    ty -= line_step
+    # Un seul objet texte (un bloc BT/ET) ; alignement à droite calculé ici :
+    # abscisses des libellés constantes, largeur des montants mesurée
+    ty = _TOTALS_Y
+    tobj = c.beginText()
+    cur_font = None
+    for (label, font, label_x), cents in zip(
+        _TOTALS_ROWS,
+        (
+            getattr(inv, "subtotal_cents", 0),
+            getattr(inv, "vat_cents", 0),
+            getattr(inv, "total_cents", 0),
+        ),
+    ):
+        value = cents_to_euros(cents)
+        if font != cur_font:
+            tobj.setFont(font, 10)
+            cur_font = font
+        tobj.setTextOrigin(label_x, ty)
+        tobj.textOut(label)
+        tobj.setTextOrigin(_VALUE_X - stringWidth(value, font, 10), ty)
+        tobj.textOut(value)
+        ty -= _TOTALS_DY
+    c.drawText(tobj)
 
     # =========================
     # Message
     # =========================
     c.setFont("Helvetica", 10)
-    c.drawString(left, bottom, "Merci pour votre confiance.")
+    c.drawString(_LEFT, _BOTTOM, "Merci pour votre confiance.")
 
     c.save()
     return PdfResult(pdf_path=out_path)
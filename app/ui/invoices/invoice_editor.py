@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import os
 import re
+import sqlite3
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import date as _date
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import QObject, QRunnable, QSignalBlocker, QThreadPool, Qt, QTimer, Signal
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -23,8 +26,10 @@ from PySide6.QtWidgets import (
     QAbstractItemView,
 )
 
+from app.db.pool import ReadPool
 from app.db.repos.invoice_repo import InvoiceRepository
 from app.db.repos.pdf_repo import PdfExportRepository
+from app.domain.money import euros_to_cents
 from app.utils.paths import exports_dir
 from app.pdf.render_invoice import render_invoice_pdf
 from app.utils.dates import today_fr, fr_to_iso, iso_to_fr
@@ -35,11 +40,24 @@ from app.utils.dates import today_fr, fr_to_iso, iso_to_fr
 # Helpers date FR <-> ISO
 # =========================
 
+# Caractères interdits Windows : \ / : * ? " < > | (une suite devient un seul "-")
+_BAD_CHARS = frozenset('\\/:*?"<>|')
+_BAD_CHARS_RE = re.compile(r'[\\/:*?"<>|]+')
+
+
 def _safe_filename_part(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r'[\\/:*?"<>|]+', "-", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    # Cas courant (aucun caractère interdit) : pas de passage regex
+    if not _BAD_CHARS.isdisjoint(s):
+        s = _BAD_CHARS_RE.sub("-", s)
+    # split() sans argument : mêmes blancs que \s, suites compressées, bords retirés
+    return " ".join(s.split())
+
+
+def _cents_to_eur(cents: int) -> str:
+    """Centimes -> "12.50" (sans symbole) : arithmétique entière, sans float."""
+    euros, rest = divmod(abs(cents), 100)
+    return f"{'-' if cents < 0 else ''}{euros}.{rest:02d}"
 
 
 def wrap_n_chars(text: str, n: int) -> str:
@@ -54,6 +72,72 @@ def wrap_n_chars(text: str, n: int) -> str:
     return "\n".join(out)
 
 
+@contextmanager
+def _frozen(widget: QWidget) -> Iterator[None]:
+    """Aucun repeint pendant le bloc (remplissages en masse), rétabli même en cas d'erreur."""
+    widget.setUpdatesEnabled(False)
+    try:
+        yield
+    finally:
+        widget.setUpdatesEnabled(True)
+
+
+def _open_folder(folder: str) -> None:
+    # Ouvrir le dossier exports (Windows) ; ignoré ailleurs ou en cas d'échec
+    try:
+        os.startfile(folder)
+    except Exception:
+        pass
+
+
+def _render_to(conn: sqlite3.Connection, invoice_id: int, out_path: Path) -> Path:
+    """
+    Rendu dans un fichier temporaire puis renommé (os.replace, atomique) :
+    remplace un export existant sans exists()/unlink(), jamais de PDF partiel.
+    """
+    tmp_path = out_path.with_name(out_path.name + ".part")
+    try:
+        render_invoice_pdf(conn=conn, invoice_id=invoice_id, out_path=tmp_path)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        # Nettoyage si création partielle
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except Exception:
+            pass
+        raise
+    return out_path
+
+
+class _PdfSignals(QObject):
+    # Émis depuis le thread du pool, reçus dans le thread UI (connexion en file)
+    done = Signal(int, object)  # invoice_id, Path du PDF
+    failed = Signal(str)
+
+
+class _PdfJob(QRunnable):
+    """
+    Rendu PDF hors du thread UI, sur une connexion lecture seule du pool
+    (la facture vient d'être enregistrée et validée : visible des lecteurs WAL).
+    """
+
+    def __init__(self, read_pool: ReadPool, invoice_id: int, out_path: Path) -> None:
+        super().__init__()
+        self.read_pool = read_pool
+        self.invoice_id = invoice_id
+        self.out_path = out_path
+        self.signals = _PdfSignals()
+
+    def run(self) -> None:
+        try:
+            with self.read_pool.reader() as ro_conn:
+                pdf_path = _render_to(ro_conn, self.invoice_id, self.out_path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.done.emit(self.invoice_id, pdf_path)
+
+
 @dataclass
 class _Line:
     qty: int
@@ -83,6 +167,7 @@ class InvoiceEditorWidget(QWidget):
         pdf_repo: PdfExportRepository,
         backup_scheduler,
         invoice_id: Optional[int] = None,
+        read_pool: Optional[ReadPool] = None,
         parent=None,
     ) -> None:
         super().__init__(parent)
@@ -90,6 +175,32 @@ class InvoiceEditorWidget(QWidget):
         self.pdf_repo = pdf_repo
         self.backup = backup_scheduler
         self.invoice_id: Optional[int] = invoice_id
+        # Sans pool (ex. DB en mémoire), le rendu PDF reste synchrone sur repo.conn
+        self.read_pool = read_pool
+        self._pdf_job: Optional[_PdfJob] = None
+        # Dossier d'exports résolu (et créé) une seule fois pour la durée de l'éditeur
+        self._exports_dir: Path = exports_dir().resolve()
+        self._exports_dir_str = str(self._exports_dir)
+
+        # Totaux courants (centimes), tenus à jour par _recalc_totals :
+        # l'affichage ne relit jamais la base
+        self._subtotal_cents = 0
+        self._vat_cents = 0
+        self._total_cents = 0
+        # Valeurs par ligne (une liste par colonne, index = ligne du tableau) :
+        # une saisie ne re-parse que la cellule modifiée
+        self._qty: List[int] = []
+        self._unit_cents: List[int] = []
+        self._line_cents: List[int] = []
+        # Modifié depuis le dernier chargement / enregistrement
+        self._dirty = False
+
+        # Libellés des totaux rafraîchis une fois par rafale de saisies (collage
+        # de plusieurs cellules) ; les valeurs en mémoire restent à jour à chaque saisie
+        self._totals_timer = QTimer(self)
+        self._totals_timer.setSingleShot(True)
+        self._totals_timer.setInterval(40)
+        self._totals_timer.timeout.connect(self._refresh_totals)
 
         self._build_ui()
         self._load_or_create()
@@ -136,6 +247,17 @@ class InvoiceEditorWidget(QWidget):
         form_row.addLayout(right_form, 1)
         root.addLayout(form_row)
 
+        for edit in (
+            self.number_edit,
+            self.date_edit,
+            self.customer_name,
+            self.customer_address,
+            self.customer_postal_code,
+            self.customer_phone,
+            self.customer_email,
+        ):
+            edit.textChanged.connect(self._mark_dirty)
+
         # --- Table lines
         self.table = QTableWidget(0, 5)
         self.table.setHorizontalHeaderLabels(
@@ -161,7 +283,7 @@ class InvoiceEditorWidget(QWidget):
         self.table.setColumnWidth(3, 120)
         self.table.setColumnWidth(4, 120)
 
-        self.table.itemChanged.connect(self._recalc_from_table)
+        self.table.itemChanged.connect(self._on_item_changed)
 
         root.addWidget(self.table, 1)
 
@@ -226,23 +348,33 @@ class InvoiceEditorWidget(QWidget):
         self.customer_name.setText(h.customer_name or "")
         self.customer_address.setText(h.customer_address or "")
         self.customer_postal_code.setText(h.customer_postal_code or "")
-        self.customer_email.setText(getattr(h, "customer_email", "") or "")
-        self.customer_phone.setText(getattr(h, "customer_phone", "") or "")
-
-        self.table.blockSignals(True)
-        self.table.setRowCount(0)
-        for ln in self.repo.get_lines(self.invoice_id):
-            self._insert_line_row(
-                qty=str(ln.qty),
-                reference=getattr(ln, "reference", "") or "",
-                description=ln.description or "",
-                unit_price=f"{ln.unit_price_cents/100:.2f}",
-                total=f"{ln.line_total_cents/100:.2f}",
-            )
-        self.table.blockSignals(False)
+        self.customer_email.setText(h.customer_email or "")
+        self.customer_phone.setText(h.customer_phone or "")
+
+        lines = self.repo.get_lines(self.invoice_id)
+
+        # Remplissage en bloc : nombre de lignes fixé une fois, ni signaux ni
+        # repeint pendant la boucle (hauteurs recalculées par _recalc_totals).
+        # InvoiceLine (repository) : reference / description toujours présents, non NULL
+        with _frozen(self.table), QSignalBlocker(self.table):
+            self.table.setRowCount(0)
+            self.table.setRowCount(len(lines))
+            for r, ln in enumerate(lines):
+                self._set_line_row(
+                    r,
+                    qty=str(ln.qty),
+                    reference=ln.reference,
+                    description=ln.description,
+                    unit_price=_cents_to_eur(ln.unit_price_cents),
+                    total=_cents_to_eur(ln.line_total_cents),
+                )
 
         self._recalc_totals()
-        self.table.resizeRowsToContents()
+        # Les setText ci-dessus ont déclenché textChanged : état chargé = propre
+        self._dirty = False
+
+    def _mark_dirty(self, *_args) -> None:
+        self._dirty = True
 
     # -------------------------
     # Table helpers
@@ -258,7 +390,20 @@ class InvoiceEditorWidget(QWidget):
     ) -> None:
         r = self.table.rowCount()
         self.table.insertRow(r)
+        self._set_line_row(
+            r, qty=qty, reference=reference, description=description, unit_price=unit_price, total=total
+        )
 
+    def _set_line_row(
+        self,
+        r: int,
+        *,
+        qty: str,
+        reference: str,
+        description: str,
+        unit_price: str,
+        total: str,
+    ) -> None:
         it_qty = QTableWidgetItem(qty)
         it_ref = QTableWidgetItem(wrap_n_chars(reference, 18))
         it_desc = QTableWidgetItem(wrap_n_chars(description, 40))
@@ -284,26 +429,52 @@ class InvoiceEditorWidget(QWidget):
         self.table.setItem(r, 4, it_total)
 
     def _append_line(self) -> None:
-        self.table.blockSignals(True)
-        self._insert_line_row(qty="1", reference="", description="", unit_price="0.00", total="0.00")
-        self.table.blockSignals(False)
+        with QSignalBlocker(self.table):
+            self._insert_line_row(qty="1", reference="", description="", unit_price="0.00", total="0.00")
+        self._dirty = True
+        # Qté 1 à 0.00 : total inchangé
+        self._qty.append(1)
+        self._unit_cents.append(0)
+        self._line_cents.append(0)
         self.table.resizeRowsToContents()
 
     def _delete_selected_line(self) -> None:
         row = self.table.currentRow()
         if row < 0:
             return
-        self.table.blockSignals(True)
-        self.table.removeRow(row)
-        self.table.blockSignals(False)
-        self._recalc_totals()
+        with QSignalBlocker(self.table):
+            self.table.removeRow(row)
+        self._dirty = True
+        del self._qty[row], self._unit_cents[row]
+        self._set_subtotal(self._subtotal_cents - self._line_cents.pop(row))
 
     # -------------------------
     # Recalc
     # -------------------------
-    def _recalc_from_table(self) -> None:
-        # recalcul ligne modifiée + totaux
-        self._recalc_totals()
+    def _on_item_changed(self, item: QTableWidgetItem) -> None:
+        # Recalcul de la seule ligne modifiée ; le sous-total est corrigé de l'écart
+        self._dirty = True
+        r = item.row()
+        col = item.column()
+        if r >= len(self._line_cents):
+            # Ligne inconnue du cache (ne devrait pas arriver) : recalcul complet
+            self._recalc_totals()
+            return
+        if col == 0:
+            self._qty[r] = self._parse_qty(item.text())
+        elif col == 3:
+            self._unit_cents[r] = self._parse_eur_to_cents(item.text())
+        else:
+            # Référence / description : seule la hauteur de la ligne peut changer
+            self.table.resizeRowToContents(r)
+            return
+
+        line_total_cents = self._qty[r] * self._unit_cents[r]
+        old_cents = self._line_cents[r]
+        self._line_cents[r] = line_total_cents
+        self._set_line_total_cell(r, line_total_cents)
+        self._set_subtotal(self._subtotal_cents + line_total_cents - old_cents)
+        self.table.resizeRowToContents(r)
 
     @staticmethod
     def _parse_qty(s: str) -> int:
@@ -317,9 +488,16 @@ class InvoiceEditorWidget(QWidget):
 
     @staticmethod
     def _parse_eur_to_cents(s: str) -> int:
-        s = (s or "").strip().replace(",", ".")
+        s = (s or "").strip()
         if not s:
             return 0
+        # Cas courant ("12", "12,5", "12.50 €") : calcul entier exact, mémoïsé
+        try:
+            return euros_to_cents(s)
+        except ValueError:
+            pass
+        # Autres saisies (négatif, plus de 2 décimales...) : via float
+        s = s.replace(",", ".")
         try:
             v = float(s)
         except Exception:
@@ -328,33 +506,55 @@ class InvoiceEditorWidget(QWidget):
         return int(round(v * 100))
 
     def _recalc_totals(self) -> None:
-        subtotal_cents = 0
+        """Parcours complet du tableau : reconstruit le cache par ligne et les totaux."""
+        qtys: List[int] = []
+        units: List[int] = []
+        line_totals: List[int] = []
 
-        self.table.blockSignals(True)
         for r in range(self.table.rowCount()):
             qty = self._parse_qty(self._item_text(r, 0))
             up_cents = self._parse_eur_to_cents(self._item_text(r, 3))
             line_total_cents = qty * up_cents
-            subtotal_cents += line_total_cents
+            qtys.append(qty)
+            units.append(up_cents)
+            line_totals.append(line_total_cents)
+            self._set_line_total_cell(r, line_total_cents)
 
-            it_total = self.table.item(r, 4)
+        self._qty, self._unit_cents, self._line_cents = qtys, units, line_totals
+        self._set_subtotal(sum(line_totals))
+
+        self.table.resizeRowsToContents()
+
+    def _set_line_total_cell(self, r: int, line_total_cents: int) -> None:
+        # QSignalBlocker rétablit l'état précédent : appelable depuis une section déjà bloquée
+        text = _cents_to_eur(line_total_cents)
+        it_total = self.table.item(r, 4)
+        # Texte inchangé : pas de setText (ni dataChanged ni relayout côté Qt)
+        if it_total is not None and it_total.text() == text:
+            return
+        with QSignalBlocker(self.table):
             if it_total is None:
-                it_total = QTableWidgetItem()
+                it_total = QTableWidgetItem(text)
                 it_total.setFlags(it_total.flags() & ~Qt.ItemIsEditable)
                 it_total.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
                 self.table.setItem(r, 4, it_total)
-            it_total.setText(f"{line_total_cents/100:.2f}")
-        self.table.blockSignals(False)
+            else:
+                it_total.setText(text)
 
+    def _set_subtotal(self, subtotal_cents: int) -> None:
         vat_rate = 20
         vat_cents = (subtotal_cents * vat_rate) // 100
-        total_cents = subtotal_cents + vat_cents
-
-        self.lbl_subtotal.setText(f"Sous-total (HT) : {subtotal_cents/100:.2f} €")
-        self.lbl_vat.setText(f"TVA (20%) : {vat_cents/100:.2f} €")
-        self.lbl_total.setText(f"Total (TTC) : {total_cents/100:.2f} €")
-
-        self.table.resizeRowsToContents()
+        self._subtotal_cents = subtotal_cents
+        self._vat_cents = vat_cents
+        self._total_cents = subtotal_cents + vat_cents
+        # Redémarre le délai : un seul rafraîchissement pour la rafale
+        self._totals_timer.start()
+
+    def _refresh_totals(self) -> None:
+        # Libellés formatés depuis les totaux en mémoire
+        self.lbl_subtotal.setText(f"Sous-total (HT) : {_cents_to_eur(self._subtotal_cents)} €")
+        self.lbl_vat.setText(f"TVA (20%) : {_cents_to_eur(self._vat_cents)} €")
+        self.lbl_total.setText(f"Total (TTC) : {_cents_to_eur(self._total_cents)} €")
 
     def _item_text(self, row: int, col: int) -> str:
         it = self.table.item(row, col)
@@ -363,132 +563,149 @@ class InvoiceEditorWidget(QWidget):
     # -------------------------
     # Save
     # -------------------------
-    def _ensure_persisted(self) -> None:
-        if self.invoice_id is None:
-            self.invoice_id = self.repo.create_draft(_date.today().isoformat())
-
-    def _collect_lines_for_save(self) -> List[Tuple[int, str, str, int, int]]:
+    def _collect_lines_for_save(self) -> Tuple[int, List[Tuple[int, str, str, int, int]]]:
         """
-        Retourne une liste de lignes pour repo.save_invoice, format:
+        Un seul parcours du tableau pour l'enregistrement. Retourne
+        (subtotal_cents, lignes pour repo.save_invoice), format des lignes:
         (qty, reference, description, unit_price_cents, line_total_cents)
+        Qté / prix / total viennent du cache par ligne (déjà parsés à la saisie).
         """
+        item = self.table.item
+        subtotal_cents = 0
         out: List[Tuple[int, str, str, int, int]] = []
-        for r in range(self.table.rowCount()):
-            qty = self._parse_qty(self._item_text(r, 0))
-
+        for r, (qty, up_cents, lt_cents) in enumerate(
+            zip(self._qty, self._unit_cents, self._line_cents)
+        ):
             # IMPORTANT: on enregistre le TEXTE ACTUEL (celui édité), pas le tooltip
-            reference = self._item_text(r, 1).strip()
-            description = self._item_text(r, 2).strip()
-
-            up_cents = self._parse_eur_to_cents(self._item_text(r, 3))
-            lt_cents = qty * up_cents
+            it_ref = item(r, 1)
+            it_desc = item(r, 2)
+            reference = it_ref.text().strip() if it_ref else ""
+            description = it_desc.text().strip() if it_desc else ""
 
             if qty == 0 and not reference and not description and up_cents == 0:
                 continue
 
             out.append((qty, reference, description, up_cents, lt_cents))
-        return out
+            subtotal_cents += lt_cents
+        return subtotal_cents, out
+
+    def _persist_now(self) -> Tuple[int, str]:
+        """
+        Enregistre la facture (en-tête + lignes) sans message.
+        Retourne (invoice_id, numéro enregistré). Lève une exception en cas d'échec.
+        """
+        # Date FR -> ISO ; si vide, on auto-remplit
+        if not self.date_edit.text().strip():
+            self.date_edit.setText(today_fr())
+        date_iso = fr_to_iso(self.date_edit.text())
+
+        # Totaux cohérents avec les lignes enregistrées
+        subtotal_cents, lines = self._collect_lines_for_save()
+
+        vat_rate = 20
+        vat_cents = (subtotal_cents * vat_rate) // 100
+        total_cents = subtotal_cents + vat_cents
+
+        # Brouillon déjà créé à l'ouverture (_load_or_create)
+        invoice_id = self.invoice_id
+        assert invoice_id is not None
+        # save_invoice écrit en-tête + lignes dans sa propre transaction
+        number = self.repo.save_invoice(
+            invoice_id,
+            number=self.number_edit.text(),
+            date_iso=date_iso,
+            customer_name=self.customer_name.text(),
+            customer_address=self.customer_address.text(),
+            customer_postal_code=self.customer_postal_code.text(),
+            customer_email=self.customer_email.text(),
+            customer_phone=self.customer_phone.text(),
+            subtotal_cents=subtotal_cents,
+            vat_rate=vat_rate,
+            vat_cents=vat_cents,
+            total_cents=total_cents,
+            lines=lines,
+        )
+        self._dirty = False
+
+        self.backup.mark_dirty()
+        self._emit_title()
+        self.invoice_persisted.emit(invoice_id)
+        return invoice_id, number
 
     def _save_draft(self) -> None:
-        try:
-            self._ensure_persisted()
-            assert self.invoice_id is not None
-
-            # Date FR -> ISO ; si vide, on auto-remplit
-            if not self.date_edit.text().strip():
-                self.date_edit.setText(today_fr())
-            date_iso = fr_to_iso(self.date_edit.text())
-
-            lines = self._collect_lines_for_save()
-
-            # Calcul totaux cohérents avec table
-            subtotal_cents = 0
-            for qty, _ref, _desc, up_cents, lt_cents in lines:
-                subtotal_cents += lt_cents
-
-            vat_rate = 20
-            vat_cents = (subtotal_cents * vat_rate) // 100
-            total_cents = subtotal_cents + vat_cents
-
-            self.repo.save_invoice(
-                self.invoice_id,
-                number=self.number_edit.text(),
-                date_iso=date_iso,
-                customer_name=self.customer_name.text(),
-                customer_address=self.customer_address.text(),
-                customer_postal_code=self.customer_postal_code.text(),
-                customer_email=self.customer_email.text(),
-                customer_phone=self.customer_phone.text(),
-                subtotal_cents=subtotal_cents,
-                vat_rate=vat_rate,
-                vat_cents=vat_cents,
-                total_cents=total_cents,
-                lines=lines,  # type: ignore[arg-type]
-            )
-            
-            QMessageBox.information(
-                self,
-                "Facture",
-                "✅ Facture enregistrée avec succès."
-            )
-            self.backup.mark_dirty()
-            self._emit_title()
-            self.invoice_persisted.emit(self.invoice_id)
-        except Exception as e:
-            QMessageBox.warning(self, "Enregistrer", str(e))
+        # Rien de modifié depuis le dernier enregistrement : aucune écriture
+        if self._dirty:
+            try:
+                self._persist_now()
+            except Exception as e:
+                QMessageBox.warning(self, "Enregistrer", str(e))
+                return
+        QMessageBox.information(
+            self,
+            "Facture",
+            "✅ Facture enregistrée avec succès."
+        )
 
     # -------------------------
     # PDF
     # -------------------------
     def _export_pdf(self) -> None:
+        # Un seul export en cours à la fois
+        if self._pdf_job is not None:
+            return
         try:
-            self._ensure_persisted()
-            self._save_draft()
-            assert self.invoice_id is not None
+            # Enregistrement silencieux : numéro et client connus sans relire la base
+            invoice_id, number = self._persist_now()
 
-            header = self.repo.get_header(self.invoice_id)
-            inv_number = (header.number or "").strip() or "SANS_NUMERO"
-            client_name = _safe_filename_part(header.customer_name) or "Client"
+            inv_number = number or "SANS_NUMERO"
+            client_name = _safe_filename_part(self.customer_name.text()) or "Client"
 
             filename = f"Facture_{_safe_filename_part(inv_number)}_{client_name}.pdf"
-            out_path = exports_dir() / filename
-
-            # Écrase si déjà existant
-            try:
-                if out_path.exists():
-                    out_path.unlink()
-            except Exception:
-                pass
-
-            result = render_invoice_pdf(
-                conn=self.repo.conn,
-                invoice_id=self.invoice_id,
-                out_path=out_path,
-            )
+            out_path = self._exports_dir / filename
 
-            pdf_path = Path(result.pdf_path)
-            if not pdf_path.exists():
-                raise RuntimeError(f"PDF non trouvé après génération : {pdf_path.resolve()}")
+            if self.read_pool is None:
+                # Écrase l'export existant (remplacement atomique)
+                pdf_path = _render_to(self.repo.conn, invoice_id, out_path)
+                self._on_pdf_done(invoice_id, pdf_path)
+                return
+        except Exception as e:
+            QMessageBox.warning(self, "PDF", str(e))
+            return
 
+        # Rendu dans le pool de threads : l'UI reste réactive
+        job = _PdfJob(self.read_pool, invoice_id, out_path)
+        job.signals.done.connect(self._on_pdf_done)
+        job.signals.failed.connect(self._on_pdf_failed)
+        self._pdf_job = job
+        self.btn_export.setEnabled(False)
+        QThreadPool.globalInstance().start(job)
+
+    def _on_pdf_done(self, invoice_id: int, pdf_path: Path) -> None:
+        self._pdf_job = None
+        self.btn_export.setEnabled(True)
+        try:
             self.pdf_repo.replace_invoice_export(
-                invoice_id=self.invoice_id,
+                invoice_id=invoice_id,
                 filename=pdf_path.name,
                 rel_path=f"exports/{pdf_path.name}",
             )
 
             self.backup.mark_dirty()
 
-            # Ouvrir le dossier exports
-            try:
-                import os
-                os.startfile(str(pdf_path.parent.resolve()))
-            except Exception:
-                pass
+            # Dans le thread UI (ShellExecute a besoin de COM initialisé),
+            # une fois l'export enregistré
+            _open_folder(self._exports_dir_str)
 
-            QMessageBox.information(self, "PDF", f"PDF généré :\n{pdf_path.resolve()}")
+            # Chemin déjà absolu (construit depuis _exports_dir résolu)
+            QMessageBox.information(self, "PDF", f"PDF généré :\n{pdf_path}")
         except Exception as e:
             QMessageBox.warning(self, "PDF", str(e))
 
+    def _on_pdf_failed(self, msg: str) -> None:
+        self._pdf_job = None
+        self.btn_export.setEnabled(True)
+        QMessageBox.warning(self, "PDF", msg)
+
     # -------------------------
     # Tab title
     # -------------------------
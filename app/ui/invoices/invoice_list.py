@@ -1,15 +1,103 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Qt, Signal
+from typing import List
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, Signal
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QTableWidget,
-    QTableWidgetItem, QMessageBox, QHeaderView
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QTableView,
+    QAbstractItemView, QMessageBox, QHeaderView
 )
 
-from app.db.repos.invoice_repo import InvoiceRepository
+from app.db.repos.invoice_repo import InvoiceListItem, InvoiceRepository
 from app.domain.money import cents_to_euros
 
 
+# Lignes lues par page : la suite est chargée quand la vue défile jusqu'en bas
+_PAGE_SIZE = 200
+
+# Délai de calme après la dernière frappe avant de relancer la recherche (ms)
+_SEARCH_DEBOUNCE_MS = 150
+
+# Alignement de la colonne Total, calculé une fois (renvoyé pour chaque cellule peinte)
+_RIGHT_ALIGN = int(Qt.AlignRight | Qt.AlignVCenter)
+
+
+class InvoiceTableModel(QAbstractTableModel):
+    """
+    Modèle de la liste des factures : les lignes restent des InvoiceListItem,
+    le texte de chaque cellule n'est produit qu'à l'affichage (lignes visibles).
+    Les lignes sont lues par pages de _PAGE_SIZE (canFetchMore / fetchMore).
+    """
+
+    HEADERS = ("N°", "Date", "Destinataire", "Total TTC")
+
+    def __init__(self, repo: InvoiceRepository, parent=None) -> None:
+        super().__init__(parent)
+        self.repo = repo
+        self._search = ""
+        self._rows: List[InvoiceListItem] = []
+        self._has_more = False
+
+    def reset(self, search: str) -> None:
+        # Repart de la première page pour cette recherche
+        self.beginResetModel()
+        self._search = search
+        self._rows = self.repo.list_invoices_page(search, None, _PAGE_SIZE)
+        self._has_more = len(self._rows) == _PAGE_SIZE
+        self.endResetModel()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if parent.isValid() or not self._has_more:
+            return
+        # Suite après le dernier id affiché : stable même si la table a changé
+        page = self.repo.list_invoices_page(self._search, self._rows[-1].id, _PAGE_SIZE)
+        self._has_more = len(page) == _PAGE_SIZE
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def row_at(self, row: int) -> InvoiceListItem:
+        return self._rows[row]
+
+    def id_at(self, row: int) -> int:
+        # L'id reste dans la ligne : pas de colonne cachée à lire ni à convertir
+        return self._rows[row].id
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        col = index.column()
+        if role == Qt.DisplayRole:
+            it = self._rows[index.row()]
+            if col == 0:
+                return it.number or "(Brouillon)"
+            if col == 1:
+                return it.date
+            if col == 2:
+                return it.customer_name
+            if col == 3:
+                # cents_to_euros est mémoïsé (lru_cache) : montants répétés déjà formatés
+                return cents_to_euros(it.total_cents)
+        elif role == Qt.TextAlignmentRole and col == 3:
+            return _RIGHT_ALIGN
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+
 class InvoiceListWidget(QWidget):
     open_invoice = Signal(int)  # invoice_id (0 = nouvelle facture non persistée)
 
@@ -25,6 +113,12 @@ class InvoiceListWidget(QWidget):
         top = QHBoxLayout()
         self.search = QLineEdit()
         self.search.setPlaceholderText("Rechercher (001, nom, date)…")
+        # Frappes rapprochées regroupées en une seule recherche ; Entrée la lance aussitôt
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(_SEARCH_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.refresh)
+        self.search.textChanged.connect(lambda _text: self._debounce.start())
         self.search.returnPressed.connect(self.refresh)
 
         btn_new = QPushButton("Nouvelle facture")
@@ -38,26 +132,26 @@ class InvoiceListWidget(QWidget):
         top.addWidget(btn_refresh)
         layout.addLayout(top)
 
-        # 5 colonnes : ID (caché), N°, Date, Destinataire, Total TTC
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["ID", "N°", "Date", "Destinataire", "Total TTC"])
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setColumnHidden(0, True)
+        # 4 colonnes : N°, Date, Destinataire, Total TTC (l'id reste dans le modèle)
+        self.model = InvoiceTableModel(self.repo, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.doubleClicked.connect(self._open_selected)
 
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(1, QHeaderView.Fixed)    # N°
-        header.setSectionResizeMode(2, QHeaderView.Fixed)    # Date
-        header.setSectionResizeMode(4, QHeaderView.Fixed)    # Total
-        header.setSectionResizeMode(3, QHeaderView.Stretch)  # Destinataire
+        header.setSectionResizeMode(0, QHeaderView.Fixed)    # N°
+        header.setSectionResizeMode(1, QHeaderView.Fixed)    # Date
+        header.setSectionResizeMode(3, QHeaderView.Fixed)    # Total
+        header.setSectionResizeMode(2, QHeaderView.Stretch)  # Destinataire
 
-        self.table.setColumnWidth(1, 170)
-        self.table.setColumnWidth(2, 120)
-        self.table.setColumnWidth(4, 170)
+        self.table.setColumnWidth(0, 170)
+        self.table.setColumnWidth(1, 120)
+        self.table.setColumnWidth(3, 170)
 
         self.table.setStyleSheet("""
-            QTableWidget::item { padding-right: 8px; padding-left: 6px; }
+            QTableView::item { padding-right: 8px; padding-left: 6px; }
         """)
 
         layout.addWidget(self.table, stretch=1)
@@ -80,38 +174,16 @@ class InvoiceListWidget(QWidget):
         layout.addLayout(actions)
 
     def refresh(self) -> None:
-        items = self.repo.list_invoices(self.search.text())
-        self.table.setRowCount(0)
-
-        for it in items:
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-
-            # ID (caché)
-            self.table.setItem(r, 0, QTableWidgetItem(str(it.id)))
-
-            # N° + statut
-            number = (it.number or "(Brouillon)")
-
-            self.table.setItem(r, 1, QTableWidgetItem(number))
-
-            # Date
-            self.table.setItem(r, 2, QTableWidgetItem(it.date))
-
-            # Destinataire
-            self.table.setItem(r, 3, QTableWidgetItem(it.customer_name))
-
-            # Total TTC
-            total_item = QTableWidgetItem(cents_to_euros(it.total_cents))
-            total_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(r, 4, total_item)
+        # Une recherche en attente est couverte par celle-ci
+        self._debounce.stop()
+        # Un seul reset du modèle : première page seulement, la vue lit ce qu'elle affiche
+        self.model.reset(self.search.text())
 
     def _selected_invoice_id(self) -> int | None:
         sel = self.table.selectionModel().selectedRows()
         if not sel:
             return None
-        row = sel[0].row()
-        return int(self.table.item(row, 0).text())
+        return self.model.id_at(sel[0].row())
 
     def _new_invoice(self) -> None:
         self.open_invoice.emit(0)
@@ -5,17 +5,18 @@ import re
 import shutil
 import sqlite3
 from pathlib import Path
+from typing import List, Optional
 from urllib.parse import quote
 
-from PySide6.QtCore import QUrl
-from PySide6.QtGui import QDesktopServices
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QUrl
+from PySide6.QtGui import QColor, QDesktopServices
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QAbstractItemView,
     QMessageBox,
     QHeaderView,
     QDialog,
@@ -25,7 +26,7 @@ from PySide6.QtWidgets import (
     QFileDialog,
 )
 
-from app.db.repos.pdf_repo import PdfExportRepository
+from app.db.repos.pdf_repo import PdfExportItem, PdfExportRepository
 from app.db.repos.invoice_repo import InvoiceRepository
 from app.db.repos.settings_repo import SettingsRepository
 from app.utils.paths import exports_dir
@@ -33,13 +34,93 @@ from app.utils.paths import exports_dir
 
 _EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
-def _safe_filename_part(s: str) -> str:
-    s = (s or "").strip()
-    # remplace caractères interdits Windows: \ / : * ? " < > |
-    s = re.sub(r'[\\/:*?"<>|]+', "-", s)
-    # compresser espaces
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+
+def _mail_body(s: dict[str, str]) -> str:
+    """Corps du mail de partage : texte fixe + signature du garage (paramètres)."""
+    g_name = (s.get("garage_name") or "HA AUTOS").strip()
+    g_addr = (s.get("garage_address") or "").strip()
+    g_cp = (s.get("garage_postal_code") or "").strip()
+    g_phone = (s.get("garage_phone") or "").strip()
+    g_siret = (s.get("garage_siret") or "").strip()
+
+    body_lines = [
+        "Bonjour,",
+        "",
+        "Veuillez trouver ci-joint votre facture.",
+        "",
+        "N’hésitez pas à nous contacter pour toute question ou information complémentaire.",
+        "",
+        "Cordialement,",
+        "",
+        g_name,
+    ]
+    if g_siret:
+        body_lines.append(g_siret)
+    if g_addr:
+        body_lines.append(g_addr)
+    if g_cp:
+        body_lines.append(g_cp)
+    if g_phone:
+        body_lines.append(g_phone)
+    return "\n".join(body_lines)
+
+
+# Texte des lignes dont le fichier PDF est absent du dossier exports
+_MISSING_FG = QColor(Qt.gray)
+
+
+class PdfExportTableModel(QAbstractTableModel):
+    """
+    Modèle de la liste des PDF : les lignes restent des PdfExportItem,
+    le texte de chaque cellule n'est produit qu'à l'affichage (lignes visibles).
+    Les PDF absents du disque (noms hors de `present`) sont grisés.
+    """
+
+    HEADERS = ("Facture", "Fichier", "Date", "Type")
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._rows: List[PdfExportItem] = []
+        self._present: set[str] = set()
+
+    def set_rows(self, rows: List[PdfExportItem], present: set[str]) -> None:
+        self.beginResetModel()
+        self._rows = rows
+        self._present = present
+        self.endResetModel()
+
+    def row_at(self, row: int) -> PdfExportItem:
+        return self._rows[row]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role == Qt.ForegroundRole:
+            it = self._rows[index.row()]
+            return None if it.filename.strip() in self._present else _MISSING_FG
+        if role != Qt.DisplayRole:
+            return None
+        it = self._rows[index.row()]
+        col = index.column()
+        if col == 0:
+            return str(it.invoice_id)
+        if col == 1:
+            return it.filename
+        if col == 2:
+            return it.created_at
+        if col == 3:
+            return it.kind
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
 
 class ShareEmailDialog(QDialog):
     def __init__(self, parent=None, *, default_folder: str = "") -> None:
@@ -67,27 +148,35 @@ class PdfListWidget(QWidget):
         self.conn = conn
         self.invoice_repo = InvoiceRepository(conn)
         self.settings_repo = SettingsRepository(conn)
+        # Paramètres garage lus une fois ; relus par reload_settings() à l'enregistrement
+        self._settings: dict[str, str] = {}
+        self._mail_body_q = ""
+        self.reload_settings()
+        # Dossier exports résolu une fois : pas de resolve() à chaque action
+        self._exports_root = exports_dir().resolve()
+        # Noms des fichiers présents dans le dossier exports (relu à chaque refresh)
+        self._present: set[str] = set()
         self._build_ui()
         self.refresh()
 
     def _build_ui(self) -> None:
         layout = QVBoxLayout(self)
 
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["ID", "Facture", "Fichier", "Date", "Type"])
-        self.table.setColumnHidden(0, True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.model = PdfExportTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.doubleClicked.connect(self._open_selected)
 
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(1, QHeaderView.Fixed)
-        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        header.setSectionResizeMode(0, QHeaderView.Fixed)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.Fixed)
         header.setSectionResizeMode(3, QHeaderView.Fixed)
-        header.setSectionResizeMode(4, QHeaderView.Fixed)
-        self.table.setColumnWidth(1, 90)
-        self.table.setColumnWidth(3, 170)
-        self.table.setColumnWidth(4, 90)
+        self.table.setColumnWidth(0, 90)
+        self.table.setColumnWidth(2, 170)
+        self.table.setColumnWidth(3, 90)
 
         layout.addWidget(self.table, stretch=1)
 
@@ -118,48 +207,49 @@ class PdfListWidget(QWidget):
         layout.addLayout(actions)
 
     def refresh(self) -> None:
-        items = self.repo.list_all()
-        self.table.setRowCount(0)
-
-        for it in items:
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-            self.table.setItem(r, 0, QTableWidgetItem(str(it.id)))
-            self.table.setItem(r, 1, QTableWidgetItem(str(it.invoice_id)))
-            self.table.setItem(r, 2, QTableWidgetItem(it.filename))
-            self.table.setItem(r, 3, QTableWidgetItem(it.created_at))
-            self.table.setItem(r, 4, QTableWidgetItem(it.kind))
-
-    def _selected_row(self) -> int | None:
+        # Un seul parcours du dossier : le grisé des PDF absents devient une recherche
+        # dans un set (pas de stat par fichier à l'affichage)
+        try:
+            with os.scandir(self._exports_root) as it:
+                self._present = {e.name for e in it if e.is_file()}
+        except OSError:
+            self._present = set()
+        # Un seul reset du modèle : aucune cellule créée, la vue lit ce qu'elle affiche
+        self.model.set_rows(self.repo.list_all(), self._present)
+
+    def reload_settings(self) -> None:
+        self._settings = self.settings_repo.get()
+        # Corps du mail (texte fixe + signature garage) : ne dépend que des paramètres,
+        # encodé une fois pour l'URL mailto
+        self._mail_body_q = quote(_mail_body(self._settings))
+
+    def _pdf_exists(self, filename: str) -> bool:
+        # Au clic : un stat sur disque (le fichier a pu changer depuis le refresh) ;
+        # le résultat met à jour le set utilisé pour le grisé
+        exists = (self._exports_root / filename).is_file()
+        if exists:
+            self._present.add(filename)
+        else:
+            self._present.discard(filename)
+        return exists
+
+    def _selected_item(self) -> Optional[PdfExportItem]:
         sel = self.table.selectionModel().selectedRows()
         if not sel:
             return None
-        return sel[0].row()
+        return self.model.row_at(sel[0].row())
 
     def _selected_pdf_id(self) -> int | None:
-        row = self._selected_row()
-        if row is None:
-            return None
-        return int(self.table.item(row, 0).text())
+        item = self._selected_item()
+        return item.id if item else None
 
     def _selected_invoice_id(self) -> int | None:
-        row = self._selected_row()
-        if row is None:
-            return None
-        item = self.table.item(row, 1)
-        if not item:
-            return None
-        try:
-            return int(item.text())
-        except Exception:
-            return None
+        item = self._selected_item()
+        return item.invoice_id if item else None
 
     def _selected_filename(self) -> str | None:
-        row = self._selected_row()
-        if row is None:
-            return None
-        item = self.table.item(row, 2)  # colonne "Fichier"
-        return item.text().strip() if item else None
+        item = self._selected_item()
+        return item.filename.strip() if item else None
 
     def _open_selected(self) -> None:
         filename = self._selected_filename()
@@ -167,9 +257,9 @@ class PdfListWidget(QWidget):
             QMessageBox.information(self, "Ouvrir", "Sélectionnez un PDF.")
             return
 
-        pdf_path = exports_dir() / filename
-        if not pdf_path.exists():
-            QMessageBox.warning(self, "Ouvrir", f"Fichier introuvable : {pdf_path.resolve()}")
+        pdf_path = self._exports_root / filename
+        if not self._pdf_exists(filename):
+            QMessageBox.warning(self, "Ouvrir", f"Fichier introuvable : {pdf_path}")
             return
 
 
@@ -188,7 +278,7 @@ class PdfListWidget(QWidget):
             return
 
         filename = item.filename
-        pdf_path = exports_dir() / filename
+        pdf_path = self._exports_root / filename
 
         if QMessageBox.question(
             self,
@@ -200,8 +290,7 @@ class PdfListWidget(QWidget):
             return
 
         try:
-            if pdf_path.exists():
-                pdf_path.unlink()
+            pdf_path.unlink(missing_ok=True)
         except Exception as e:
             QMessageBox.warning(self, "Supprimer", f"Impossible de supprimer le fichier : {e}")
             return
@@ -215,26 +304,18 @@ class PdfListWidget(QWidget):
         self.refresh()
 
     def _share_selected(self) -> None:
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             QMessageBox.information(self, "Partager", "Sélectionnez un PDF.")
             return
 
-        filename_item = self.table.item(row, 2)  # colonne "Fichier"
-        invoice_item = self.table.item(row, 1)   # colonne "Facture"
-        if not filename_item or not invoice_item:
-            QMessageBox.warning(self, "Partager", "Sélection invalide.")
-            return
-
-        filename = filename_item.text().strip()
-        try:
-            invoice_id = int(invoice_item.text())
-        except Exception:
-            invoice_id = 0
+        item = self.model.row_at(row)
+        filename = item.filename.strip()
+        invoice_id = item.invoice_id or 0
 
-        pdf_path = exports_dir() / filename
-        if not pdf_path.exists():
-            QMessageBox.warning(self, "Partager", f"Fichier introuvable : {pdf_path.resolve()}")
+        pdf_path = self._exports_root / filename
+        if not self._pdf_exists(filename):
+            QMessageBox.warning(self, "Partager", f"Fichier introuvable : {pdf_path}")
             return
 
         # Saisie e-mail
@@ -251,47 +332,18 @@ class PdfListWidget(QWidget):
         client_name = "Client"
         inv_number = Path(filename).stem
         if invoice_id:
-            header = self.invoice_repo.get_header(invoice_id)
-            client_name = (header.customer_name or "").strip() or "Client"
-            inv_number = (header.number or "").strip() or inv_number
-
-        s = self.settings_repo.get()
-        g_name = (s.get("garage_name") or "HA AUTOS").strip()
-        g_addr = (s.get("garage_address") or "").strip()
-        g_cp = (s.get("garage_postal_code") or "").strip()
-        g_phone = (s.get("garage_phone") or "").strip()
-        g_siret = (s.get("garage_siret") or "").strip()
+            number, customer_name = self.invoice_repo.get_number_customer(invoice_id)
+            client_name = (customer_name or "").strip() or "Client"
+            inv_number = (number or "").strip() or inv_number
 
         subject = f"{inv_number} – {client_name}"
-        body_lines = [
-            "Bonjour,",
-            "",
-            f"Veuillez trouver ci-joint votre facture.",
-            "",
-            "N’hésitez pas à nous contacter pour toute question ou information complémentaire.",
-            "",
-            "Cordialement,",
-            "",
-            g_name,
-        ]
-        if g_siret:
-            body_lines.append(g_siret)
-        if g_addr:
-            body_lines.append(g_addr)
-        if g_cp:
-            body_lines.append(g_cp)
-        if g_phone:
-            body_lines.append(g_phone)
-        
-
-        body = "\n".join(body_lines)
 
-        mailto = f"mailto:{quote(to_email)}?subject={quote(subject)}&body={quote(body)}"
+        mailto = f"mailto:{quote(to_email)}?subject={quote(subject)}&body={self._mail_body_q}"
         QDesktopServices.openUrl(QUrl(mailto))
 
         # Ouvre le dossier exports pour joindre vite
         try:
-            os.startfile(str(exports_dir().resolve()))
+            os.startfile(str(self._exports_root))
         except Exception:
             pass
     
@@ -301,9 +353,9 @@ class PdfListWidget(QWidget):
             QMessageBox.information(self, "Imprimer", "Sélectionnez un PDF.")
             return
 
-        pdf_path = exports_dir() / filename
-        if not pdf_path.exists():
-            QMessageBox.warning(self, "Imprimer", f"Fichier introuvable : {pdf_path.resolve()}")
+        pdf_path = self._exports_root / filename
+        if not self._pdf_exists(filename):
+            QMessageBox.warning(self, "Imprimer", f"Fichier introuvable : {pdf_path}")
             return
 
         try:
@@ -126,6 +126,7 @@ class GarageSettingsWidget(QWidget):
         )
 
         self.backup_scheduler.mark_dirty()
+        self.backup_scheduler.invalidate_settings_cache()
 
         QMessageBox.information(
             self,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QLineEdit, QTextEdit,
     QHBoxLayout, QPushButton, QMessageBox
@@ -10,6 +11,8 @@ from app.backup.backup_scheduler import BackupScheduler
 
 
 class SettingsWidget(QWidget):
+    settings_saved = Signal()  # émis après un enregistrement réussi
+
     def __init__(self, repo: SettingsRepository, backup: BackupScheduler, parent=None) -> None:
         super().__init__(parent)
         self.repo = repo
@@ -77,6 +80,8 @@ class SettingsWidget(QWidget):
 
             # Indique au scheduler qu'il y a des changements à sauvegarder
             self.backup.mark_dirty()
+            self.backup.invalidate_settings_cache()
+            self.settings_saved.emit()
 
             QMessageBox.information(self, "Paramètres", "Paramètres enregistrés.")
         except Exception as e:
@@ -1,33 +1,49 @@
 from __future__ import annotations
 
-import re
-from datetime import date as _date, datetime
-
-_DATE_FR_RE = re.compile(r"^(\d{2})/(\d{2})/(\d{4})$")
+from datetime import date as _date
 
 
 def today_fr() -> str:
     return _date.today().strftime("%d/%m/%Y")
 
 
+def _is_fr(d: str) -> bool:
+    # jj/mm/aaaa : longueur, séparateurs et chiffres vérifiés par tranches (pas de regex)
+    return (
+        len(d) == 10
+        and d[2] == "/"
+        and d[5] == "/"
+        and d[0:2].isdecimal()
+        and d[3:5].isdecimal()
+        and d[6:10].isdecimal()
+    )
+
+
 def fr_to_iso(d: str) -> str:
     d = (d or "").strip()
     if not d:
         return _date.today().isoformat()
-    m = _DATE_FR_RE.match(d)
-    if not m:
+    if not _is_fr(d):
         raise ValueError("Date invalide. Format attendu : jj/mm/aaaa")
-    dd, mm, yyyy = m.groups()
-    dt = datetime(int(yyyy), int(mm), int(dd))
-    return dt.date().isoformat()
+    dd = int(d[0:2])
+    mm = int(d[3:5])
+    yyyy = int(d[6:10])
+    # Jour <= 28 : valide quel que soit le mois ; sinon (et année 0000)
+    # la validation calendaire complète lève la même ValueError qu'avant
+    if not (1 <= dd <= 28 and 1 <= mm <= 12 and yyyy >= 1):
+        _date(yyyy, mm, dd)
+    return f"{yyyy:04d}-{mm:02d}-{dd:02d}"
 
 
 def iso_to_fr(d: str) -> str:
     d = (d or "").strip()
     if not d:
         return today_fr()
-    if _DATE_FR_RE.match(d):
+    if _is_fr(d):
         return d
+    # Cas courant aaaa-mm-jj : tranches directes
+    if len(d) == 10 and d[4] == "-" and d[7] == "-" and d.count("-") == 2:
+        return f"{d[8:10]}/{d[5:7]}/{d[0:4]}"
     try:
         y, m, dd = d.split("-")
         return f"{dd}/{m}/{y}"
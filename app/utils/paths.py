@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -40,11 +41,13 @@ def user_data_root() -> Path:
     return base / APP_NAME
 
 
+@lru_cache(maxsize=1)
 def app_data_dir() -> Path:
     """
     Choix du dossier data :
     - En dev : <repo>/data (ta racine contient déjà data/)
     - En frozen : dossier user (inscriptible)
+    Calculé (et créé) une seule fois par processus.
     """
     if _is_frozen():
         data = user_data_root() / "data"
@@ -55,7 +58,9 @@ def app_data_dir() -> Path:
     return data
 
 
+@lru_cache(maxsize=1)
 def exports_dir() -> Path:
+    # mkdir une seule fois par processus
     exports = app_data_dir() / "exports"
     exports.mkdir(parents=True, exist_ok=True)
     return exports